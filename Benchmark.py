@@ -0,0 +1,377 @@
+# Python3
+# Benchmarks of the scripts with seeded synthetic data
+#   - Generators: random walk linestrings, star & spiral polygons with holes, XYZ sounding clouds with
+#     fairway polygons, geodetic point batches
+#   - Each benchmark is timed at several input sizes, scaling exponent k (time ~ size^k) is fitted on log-log scale
+#   - Results are written to JSON and compared against a stored baseline: a benchmark slower than the baseline
+#     by more than the tolerance is reported as a regression (exit status 1)
+# Usage:
+#   python3 Benchmark.py --save-baseline     Run and store results as the baseline
+#   python3 Benchmark.py                     Run and compare to the baseline
+# Timings depend on the machine, so no baseline is committed (both JSON files are git-ignored): on a fresh
+# checkout run with --save-baseline first, until then results are only written and nothing is compared.
+# sounding_sweeper times the sweep loop of Sounding_sweeper.py (Sweep_core.iterate_points, with its stage timers,
+# progress meter and conflict log) on the Fairway_tiles index. The exact test of points on fairway boundary cells
+# is done with shapely like in the sweeper if shapely is installed, otherwise with a stand-in using
+# point_in_polygon.winding_number (reported in the output and the results file).
+
+import argparse
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+
+from Datum_transformations import cartesian_to_geodetic, euref_fin_kkj, geodetic_to_cartesian, grs80, helmert, international_1924
+from Fairway_tiles import build_tile_index
+from Geometry_codec import linestring_wkt, point, polygon, to_wkt
+from Line_intersection import lines_intersect
+from Line_smoothing import douglas_peucker, visvalingam
+from point_in_polygon import point_in_polygon, winding_number
+from Sweep_core import iterate_points
+from Sweep_monitor import TIMING_SAMPLE, ProgressMeter, SweepStats, buffered_logger
+
+
+RESULTS_FILE  = "benchmark_results.json"
+BASELINE_FILE = "benchmark_baseline.json"
+TOLERANCE     = 0.25        # Allowed slowdown vs. baseline (0.25 = 25 %)
+REPEAT        = 3           # Best of REPEAT runs is reported
+
+
+# # # # # # # # # # # # # #
+#   Data generators:      #
+# # # # # # # # # # # # # #
+
+# Random walk linestring of n vertices, steps of unit length on average: [(x,y), ...]
+def random_walk_line(n, seed, origin = (0.0, 0.0)):
+    rng = random.Random(seed)
+    x, y = origin
+    heading = 0.0
+    line = []
+    for i in range(n):
+        line.append((x, y))
+        heading += rng.gauss(0, 0.6)
+        x += math.cos(heading) + 0.3            # Drift in x: line proceeds instead of coiling up
+        y += math.sin(heading)
+    return line
+
+
+# Star polygon with n exterior vertices and holes (small squares around the centre)
+#   - Returns: list of rings [exterior, hole, hole, ...], rings are closed
+def star_polygon(n, seed, holes = 4, center = (0.0, 0.0), radius = 1000.0):
+    rng = random.Random(seed)
+    cx, cy = center
+    exterior = []
+    for i in range(n):
+        angle = 2 * math.pi * i / n
+        r = radius * (1.0 if i % 2 == 0 else 0.55) * rng.uniform(0.95, 1.05)
+        exterior.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+    exterior.append(exterior[0])
+
+    rings = [exterior]
+    for k in range(holes):
+        angle = 2 * math.pi * (k + 0.5) / max(holes, 1)
+        hx, hy = cx + 0.3 * radius * math.cos(angle), cy + 0.3 * radius * math.sin(angle)
+        size = 0.05 * radius
+        rings.append([(hx - size, hy - size), (hx - size, hy + size), (hx + size, hy + size), (hx + size, hy - size), (hx - size, hy - size)])
+    return rings
+
+
+# Spiral band polygon (a winding channel) with n exterior vertices and holes along the band
+#   - Archimedean spiral r = spacing * angle / 2pi, band width = spacing / 2
+#   - Returns: list of rings [exterior, hole, hole, ...], rings are closed
+def spiral_polygon(n, seed, holes = 4, center = (0.0, 0.0), turns = 3.0, spacing = 300.0):
+    rng = random.Random(seed)
+    cx, cy = center
+    half = max(n // 2, 2)
+    angles = [2 * math.pi * (0.25 + turns * i / (half - 1)) for i in range(half)]
+    width = spacing / 2
+
+    def spiral_point(angle, offset):
+        r = spacing * angle / (2 * math.pi) + offset
+        return (cx + r * math.cos(angle), cy + r * math.sin(angle))
+
+    outer = [spiral_point(a, width * rng.uniform(0.97, 1.0)) for a in angles]
+    inner = [spiral_point(a, 0.0) for a in reversed(angles)]
+    exterior = outer + inner + [outer[0]]
+
+    rings = [exterior]
+    for k in range(holes):
+        angle = angles[int((k + 1) * (half - 1) / (holes + 1))]
+        hx, hy = spiral_point(angle, width / 2)
+        size = width / 8
+        rings.append([(hx - size, hy - size), (hx - size, hy + size), (hx + size, hy + size), (hx + size, hy - size), (hx - size, hy - size)])
+    return rings
+
+
+# Fairway areas for the sweeper: a spiral channel and two star shaped harbour areas with holes
+#   - Returns: [(swept depth, rings), ...] as used by Fairway_tiles.build_tile_index
+def fairway_polygons(vertices, seed):
+    return [(12.0, spiral_polygon(vertices, seed, center = (5000.0, 5000.0))),
+            (8.0,  star_polygon(vertices // 2, seed + 1, center = (1500.0, 1500.0), radius = 1200.0)),
+            (6.5,  star_polygon(vertices // 2, seed + 2, center = (8500.0, 1800.0), radius = 1000.0))]
+
+
+# XYZ sounding cloud: n points on a 10 x 10 km area, depths 2 - 20 m (negative z), as rows of a points file
+def sounding_cloud(n, seed, size = 10000.0):
+    rng = random.Random(seed)
+    return ["%.2f %.2f %.2f\n" % (rng.uniform(0, size), rng.uniform(0, size), -rng.uniform(2.0, 20.0)) for i in range(n)]
+
+
+# Geodetic point batch: n points (lat, lon, height) in Finland
+def geodetic_points(n, seed):
+    rng = random.Random(seed)
+    return [(rng.uniform(59.8, 70.0), rng.uniform(20.5, 31.5), rng.uniform(0.0, 300.0)) for i in range(n)]
+
+
+# # # # # # # # # # # # # #
+#   Benchmarked tasks:    #
+# # # # # # # # # # # # # #
+
+# Each setup function takes (size, seed) and returns a function to time, data generation isn't timed
+
+# Two non-intersecting random walks: every segment pair is checked (worst case)
+def setup_lines_intersect(n, seed):
+    wkt_a = linestring_wkt(random_walk_line(n, seed))
+    wkt_b = linestring_wkt(random_walk_line(n, seed + 1, origin = (0.0, 1e7)))
+    return lambda: lines_intersect(wkt_a, wkt_b)
+
+
+def setup_visvalingam(n, seed):
+    wkt = linestring_wkt(random_walk_line(n, seed))
+    return lambda: visvalingam(wkt, 1.0)
+
+
+def setup_douglas_peucker(n, seed):
+    wkt = linestring_wkt(random_walk_line(n, seed))
+    return lambda: douglas_peucker(wkt, 2.0)
+
+
+# 100 points tested against a star polygon with n vertices and holes
+def setup_point_in_polygon(n, seed):
+    polygon_wkt = to_wkt(polygon(star_polygon(n, seed)))
+    rng = random.Random(seed)
+    points = [to_wkt(point(rng.uniform(-1000, 1000), rng.uniform(-1000, 1000))) for i in range(100)]
+    return lambda: [point_in_polygon(p, polygon_wkt) for p in points]
+
+
+# ETRS-FIN geodetic --> cartesian --> Helmert --> KKJ geodetic, n points
+def setup_helmert_chain(n, seed):
+    points = geodetic_points(n, seed)
+
+    def run():
+        for lat, lon, height in points:
+            kkj = helmert(geodetic_to_cartesian(grs80, lat, lon, height), euref_fin_kkj, "Coordinate Frame")
+            cartesian_to_geodetic(international_1924, kkj[0], kkj[1], kkj[2])
+    return run
+
+
+# Fairway tile index build, fairways of n vertices each
+def setup_fairway_tiles(n, seed):
+    fairways = fairway_polygons(n, seed)
+    return lambda: build_tile_index(fairways)
+
+
+# Exact geometry test of the sweeper for fairways [(swept depth, rings), ...]
+#   - Returns (name of the implementation, exact_test(point_coordinates, var_depth)) for Sweep_core.iterate_points
+#   - shapely (as in the sweeper) if installed, otherwise a stand-in with winding numbers (even-odd rule)
+def sweeper_exact_test(fairways):
+    try:
+        from shapely.geometry import Point, Polygon
+    except ImportError:
+        def exact_test(point_coordinates, var_depth):
+            xy = (float(point_coordinates[0]), float(point_coordinates[1]))
+            for sweep_depth, rings in fairways:
+                if (sum(winding_number(ring, xy) != 0 for ring in rings) % 2 == 1):
+                    return sweep_depth if var_depth < sweep_depth else None
+            return None
+        return ("winding_number stand-in", exact_test)
+
+    areas = [(sweep_depth, Polygon(rings[0], rings[1:])) for sweep_depth, rings in fairways]
+
+    def exact_test(point_coordinates, var_depth):
+        var_point = Point(float(point_coordinates[0]), float(point_coordinates[1]))
+        for sweep_depth, area in areas:
+            if (area.intersects(var_point)):
+                return sweep_depth if var_depth < sweep_depth else None
+        return None
+    return ("shapely", exact_test)
+
+
+# Output stream that discards everything (progress meter output):
+class NullStream:
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+# Sweep loop of Sounding_sweeper.py on n sounding points
+def setup_sounding_sweeper(n, seed):
+    fairways = fairway_polygons(2000, seed)
+    tiles = build_tile_index(fairways)
+    deepest_sweep = max(depth for depth, rings in fairways)
+    points = sounding_cloud(n, seed)
+    exact_name, exact_test = sweeper_exact_test(fairways)
+    log = buffered_logger("Benchmark.sweeper", "WARNING", os.devnull)  # Conflicts are logged like by default in the sweeper
+
+    def run():
+        stats = SweepStats(TIMING_SAMPLE)
+        progress = ProgressMeter(sum(len(p) for p in points), stream = NullStream())
+        if (not iterate_points(points, exact_test, deepest_sweep, tiles, io.StringIO(), io.StringIO(), stats, progress, log)):
+            raise RuntimeError("Sweep failed")
+    run.note = "exact test: " + exact_name
+    return run
+
+
+# Benchmarks: name: (setup function, sizes, quick sizes)
+BENCHMARKS = {
+    "lines_intersect":  (setup_lines_intersect,  [100, 200, 400, 800],          [50, 100, 200]),
+    "visvalingam":      (setup_visvalingam,      [250, 500, 1000, 2000],        [100, 200, 400]),
+    "douglas_peucker":  (setup_douglas_peucker,  [1000, 2000, 4000, 8000],      [500, 1000, 2000]),
+    "point_in_polygon": (setup_point_in_polygon, [1000, 2000, 4000, 8000],      [500, 1000, 2000]),
+    "helmert_chain":    (setup_helmert_chain,    [1000, 2000, 4000, 8000],      [250, 500, 1000]),
+    "fairway_tiles":    (setup_fairway_tiles,    [500, 1000, 2000, 4000],       [250, 500, 1000]),
+    "sounding_sweeper": (setup_sounding_sweeper, [10000, 20000, 40000, 80000],  [2500, 5000, 10000]),
+}
+
+
+# # # # # # # # # # # # # #
+#   Timing & reporting:   #
+# # # # # # # # # # # # # #
+
+# Function to time a call: best of repeat runs (seconds), garbage collection disabled while timing
+def time_call(function, repeat = REPEAT):
+    best = math.inf
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            started = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        if (gc_enabled):
+            gc.enable()
+    return best
+
+
+# Function to fit scaling exponent k of time = c * size^k (least squares on log-log scale):
+def scaling_exponent(sizes, seconds):
+    pairs = [(math.log(n), math.log(t)) for n, t in zip(sizes, seconds) if t > 0]
+    if (len(pairs) < 2):
+        return None
+    mx = sum(x for x, y in pairs) / len(pairs)
+    my = sum(y for x, y in pairs) / len(pairs)
+    sxx = sum((x - mx)**2 for x, y in pairs)
+    return sum((x - mx) * (y - my) for x, y in pairs) / sxx if sxx > 0 else None
+
+
+# Run benchmarks
+#   - Inputs: benchmark names, quick (smaller sizes), repeat, seed, stream for progress output
+#   - Returns: results dictionary (written as JSON)
+def run_benchmarks(names, quick = False, repeat = REPEAT, seed = 1, stream = sys.stdout):
+    results = {"created":   time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python":    platform.python_version(),
+               "platform":  platform.platform(),
+               "machine":   platform.machine(),
+               "quick":     quick,
+               "seed":      seed,
+               "repeat":    repeat,
+               "benchmarks": {}}
+
+    for name in names:
+        setup, sizes, quick_sizes = BENCHMARKS[name]
+        sizes = quick_sizes if quick else sizes
+        seconds = []
+        note = None
+        for n in sizes:
+            function = setup(n, seed)
+            note = getattr(function, "note", None)
+            seconds.append(time_call(function, repeat))
+            stream.write("%-18s n = %-7d %10.2f ms\n" % (name, n, 1000 * seconds[-1]))
+            stream.flush()
+        exponent = scaling_exponent(sizes, seconds)
+        results["benchmarks"][name] = {"sizes": sizes, "seconds": seconds, "exponent": exponent}
+        if (note is not None):
+            results["benchmarks"][name]["note"] = note
+            stream.write("%-18s %s\n" % (name, note))
+        stream.write("%-18s scaling exponent %.2f\n\n" % (name, exponent) if exponent is not None else "\n")
+    return results
+
+
+# Compare results to a baseline
+#   - Returns: list of regressions [(benchmark, size, baseline seconds, seconds, ratio), ...] and prints a
+#     comparison table. Only sizes found in both are compared.
+def compare(results, baseline, tolerance = TOLERANCE, stream = sys.stdout):
+    if (baseline.get("platform") != results.get("platform") or baseline.get("python") != results.get("python")):
+        stream.write("Note: baseline is from another platform or Python version (%s, Python %s)\n\n"
+                     % (baseline.get("platform"), baseline.get("python")))
+
+    regressions = []
+    stream.write("%-18s %8s %12s %12s %8s\n" % ("Benchmark", "Size", "Baseline ms", "Current ms", "Ratio"))
+    for name, current in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if (base is None):
+            continue
+        base_seconds = dict(zip(base["sizes"], base["seconds"]))
+        for n, t in zip(current["sizes"], current["seconds"]):
+            if (n not in base_seconds):
+                continue
+            ratio = t / base_seconds[n] if base_seconds[n] > 0 else math.inf
+            slower = ratio > 1 + tolerance
+            if (slower):
+                regressions.append((name, n, base_seconds[n], t, ratio))
+            stream.write("%-18s %8d %12.2f %12.2f %8.2f%s\n" % (name, n, 1000 * base_seconds[n], 1000 * t, ratio, "  REGRESSION" if slower else ""))
+        if (base.get("exponent") is not None and current.get("exponent") is not None):
+            stream.write("%-18s scaling exponent %.2f -> %.2f\n" % (name, base["exponent"], current["exponent"]))
+    return regressions
+
+
+# Function to write a JSON file:
+def write_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent = 2, sort_keys = True)
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmarks the scripts with synthetic data and compares results to a baseline.")
+    parser.add_argument("--only", action = "append", choices = sorted(BENCHMARKS), help = "run only this benchmark (can be repeated)")
+    parser.add_argument("--quick", action = "store_true", help = "smaller input sizes")
+    parser.add_argument("--repeat", type = int, default = REPEAT, help = "best of N runs (default: %(default)s)")
+    parser.add_argument("--seed", type = int, default = 1, help = "random seed of the data generators (default: %(default)s)")
+    parser.add_argument("--output", default = RESULTS_FILE, help = "results file (default: %(default)s)")
+    parser.add_argument("--baseline", default = BASELINE_FILE, help = "baseline file (default: %(default)s)")
+    parser.add_argument("--save-baseline", action = "store_true", help = "store results as the new baseline")
+    parser.add_argument("--tolerance", type = float, default = TOLERANCE, help = "allowed slowdown vs. baseline (default: %(default)s)")
+    options = parser.parse_args()
+
+    results = run_benchmarks(options.only or list(BENCHMARKS), options.quick, options.repeat, options.seed)
+    write_json(results, options.output)
+    print("Results written to", options.output)
+
+    if (options.save_baseline):
+        write_json(results, options.baseline)
+        print("Baseline written to", options.baseline)
+    elif (os.path.exists(options.baseline)):
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get("quick") != results["quick"] or baseline.get("seed") != results["seed"]):
+            print("\nBaseline was run with other sizes or seed, only matching sizes are compared.")
+        print()
+        regressions = compare(results, baseline, options.tolerance)
+        if (regressions):
+            print("\n%d regressions (> %.0f %% slower than baseline)" % (len(regressions), 100 * options.tolerance))
+            sys.exit(1)
+        print("\nNo regressions.")
+    else:
+        print("No baseline found (%s), run with --save-baseline to store one." % options.baseline)
@@ -88,6 +88,7 @@ def cartesian_to_geodetic(ellipsoid, xcoord, ycoord, zcoord):
 
     guess_h = 0.0
     count = 0
+    last_change = math.inf
 
     while (math.fabs(guess_h - height) > 0.0000000001):
         guess_h = height
@@ -98,6 +99,12 @@ def cartesian_to_geodetic(ellipsoid, xcoord, ycoord, zcoord):
         height = ((math.sqrt(xcoord**2 + ycoord**2)) / math.cos(lat_radians)) - n
         count += 1
 
+        # For some points the change gets stuck at rounding error level (~1e-9 m), stop when it stops decreasing:
+        change = math.fabs(guess_h - height)
+        if (change >= last_change):
+            break
+        last_change = change
+
     return (latitude, longitude, height, "Iterations: " + str(count))
 
 
@@ -168,12 +175,13 @@ def affine2d(xcoord, ycoord, params):
 #   Main (under construction)     #
 # # # # # # # # # # # # # # # # # #
 
+if __name__ == "__main__":
     # For example Geodetic (input) --> Cartesian 3D --> Helmert --> Geodetic (output)
 
-etrf = (60.196420, 24.960322, 20.0)
-cartesian = geodetic_to_cartesian(grs80, etrf[0], etrf[1], etrf[2])
-kkj = helmert(cartesian, euref_fin_kkj, "Coordinate Frame")
-kkj_geodetic = cartesian_to_geodetic(international_1924, kkj[0], kkj[1], kkj[2])
+    etrf = (60.196420, 24.960322, 20.0)
+    cartesian = geodetic_to_cartesian(grs80, etrf[0], etrf[1], etrf[2])
+    kkj = helmert(cartesian, euref_fin_kkj, "Coordinate Frame")
+    kkj_geodetic = cartesian_to_geodetic(international_1924, kkj[0], kkj[1], kkj[2])
 
-print("ETRF:", etrf)
-print("KKJ:", kkj_geodetic)
\ No newline at end of file
+    print("ETRF:", etrf)
+    print("KKJ:", kkj_geodetic)
\ No newline at end of file
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+# Depth-tiled fairway index (used by Sounding_sweeper.py)
+# Fairway areas are rasterized on a regular grid. Each grid cell stores:
+#   - a flag: fully outside all fairways, fully inside one fairway, or on a fairway boundary
+#   - the maximum swept depth of the fairways covering or touching the cell
+# Most points can be accepted or clamped with a single grid lookup, only points on boundary cells
+# need the exact geometry test.
+# The index is cached on disk, keyed by the shapefile hash and the target EPSG code.
+# Works on Python 2 & 3, no dependencies
+
+from __future__ import division
+from array import array
+import hashlib
+import math
+import os
+import struct
+import sys
+
+
+# Cell flags:
+OUTSIDE = 0     # Cell doesn't touch any fairway
+INSIDE = 1      # Cell is fully inside a fairway, no fairway boundary passes through it
+BOUNDARY = 2    # Fairway boundary passes through the cell, exact geometry test needed
+
+DEFAULT_RESOLUTION = 512    # Number of cells along the longer side of the fairway extent
+
+# Cache file header: magic, version, min x, min y, cell size, columns, rows
+TILE_MAGIC = b"FWTI"
+TILE_VERSION = 1
+TILE_HEADER = struct.Struct("<4sIdddII")
+
+EPSILON = 1e-9  # Padding (in cell units) to keep edges exactly on cell borders marked on both sides
+
+
+# Grid of fairway cells:
+class TileIndex(object):
+    def __init__(self, minx, miny, cellsize, ncols, nrows, flags=None, depths=None):
+        self.minx = minx
+        self.miny = miny
+        self.cellsize = cellsize
+        self.ncols = ncols
+        self.nrows = nrows
+        self.flags = flags if flags is not None else array("b", [OUTSIDE]) * (ncols * nrows)
+        self.depths = depths if depths is not None else array("d", [0.0]) * (ncols * nrows)
+
+    # Cell lookup for a point
+    # Returns:
+    #   - (flag, depth): cell flag and maximum swept depth on the cell
+    #   - Points outside of the grid are outside of all fairways
+    def lookup(self, x, y):
+        col = int(math.floor((x - self.minx) / self.cellsize))
+        row = int(math.floor((y - self.miny) / self.cellsize))
+        if (col < 0 or row < 0 or col >= self.ncols or row >= self.nrows):
+            return OUTSIDE, 0.0
+        cell = row * self.ncols + col
+        return self.flags[cell], self.depths[cell]
+
+
+# Function to get the rings of a (shapely) polygon or multipolygon as coordinate lists:
+def polygon_rings(geometry):
+    if (geometry is None or geometry.is_empty):
+        return []
+    parts = list(geometry.geoms) if hasattr(geometry, "geoms") else [geometry]
+    rings = []
+    for part in parts:
+        rings.append(list(part.exterior.coords))
+        for interior in part.interiors:
+            rings.append(list(interior.coords))
+    return rings
+
+
+# Function to get the cells a line segment passes through (or touches)
+# Segment is walked column by column, on each column the rows between segment y-extremes are returned
+def segment_cells(x0, y0, x1, y1, index):
+    if (x0 > x1):
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    cs = index.cellsize
+    col_start = max(int(math.floor((x0 - index.minx) / cs - EPSILON)), 0)
+    col_end = min(int(math.floor((x1 - index.minx) / cs + EPSILON)), index.ncols - 1)
+
+    for col in range(col_start, col_end + 1):
+        if (x1 == x0):  # Vertical segment
+            ya, yb = y0, y1
+        else:
+            xa = min(max(x0, index.minx + col * cs), x1)          # Segment x-range within column
+            xb = min(max(x0, index.minx + (col + 1) * cs), x1)
+            ya = y0 + (xa - x0) * (y1 - y0) / (x1 - x0)
+            yb = y0 + (xb - x0) * (y1 - y0) / (x1 - x0)
+        row_start = max(int(math.floor((min(ya, yb) - index.miny) / cs - EPSILON)), 0)
+        row_end = min(int(math.floor((max(ya, yb) - index.miny) / cs + EPSILON)), index.nrows - 1)
+        for row in range(row_start, row_end + 1):
+            yield row * index.ncols + col
+
+
+# Function to rasterize fairway areas to a tile index
+# Inputs:
+#   - List of fairways: [(swept depth, rings), ...] in the order the exact test processes them
+#       - Rings are coordinate lists [(x,y), (x,y), ...], exteriors and holes of a fairway in any order
+#   - Resolution: number of cells along the longer side of the fairway extent
+# Returns:
+#   - TileIndex
+# A cell covered by several overlapping fairways gets the depth of the first one, as in the exact test
+def build_tile_index(fairways, resolution=DEFAULT_RESOLUTION):
+    xs = [c[0] for depth, rings in fairways for ring in rings for c in ring]
+    ys = [c[1] for depth, rings in fairways for ring in rings for c in ring]
+    if (len(xs) == 0):
+        return TileIndex(0.0, 0.0, 1.0, 0, 0)   # No fairways, every point is outside
+
+    minx, miny = min(xs), min(ys)
+    cellsize = max(max(xs) - minx, max(ys) - miny) / resolution
+    if (cellsize <= 0):
+        cellsize = 1.0
+    ncols = int((max(xs) - minx) // cellsize) + 1
+    nrows = int((max(ys) - miny) // cellsize) + 1
+    index = TileIndex(minx, miny, cellsize, ncols, nrows)
+    flags = index.flags
+    depths = index.depths
+
+    for depth, rings in fairways:
+        # Cells on the fairway boundary:
+        touched = set()
+        for ring in rings:
+            for i in range(len(ring) - 1):
+                touched.update(segment_cells(ring[i][0], ring[i][1], ring[i+1][0], ring[i+1][1], index))
+        for cell in touched:
+            flags[cell] = BOUNDARY
+            depths[cell] = max(depths[cell], depth)
+
+        # Scanline fill on cell centres (even-odd rule, holes excluded):
+        crossings = {}
+        for ring in rings:
+            for i in range(len(ring) - 1):
+                (xa, ya), (xb, yb) = ring[i][:2], ring[i+1][:2]
+                if (ya == yb):
+                    continue    # Horizontal edges never cross a scanline
+                row_start = max(int(math.ceil((min(ya, yb) - miny) / cellsize - 0.5)), 0)
+                row_end = min(int(math.ceil((max(ya, yb) - miny) / cellsize - 0.5)) - 1, nrows - 1)
+                for row in range(row_start, row_end + 1):
+                    yc = miny + (row + 0.5) * cellsize
+                    crossings.setdefault(row, []).append(xa + (yc - ya) * (xb - xa) / (yb - ya))
+
+        for row, xcross in crossings.items():
+            xcross.sort()
+            for k in range(0, len(xcross) - 1, 2):
+                col_start = max(int(math.ceil((xcross[k] - minx) / cellsize - 0.5)), 0)
+                col_end = min(int(math.ceil((xcross[k+1] - minx) / cellsize - 0.5)) - 1, ncols - 1)
+                for col in range(col_start, col_end + 1):
+                    cell = row * ncols + col
+                    if (cell in touched):
+                        continue
+                    if (flags[cell] == OUTSIDE):
+                        flags[cell] = INSIDE    # First fairway covering the cell decides its depth
+                        depths[cell] = depth
+                    elif (flags[cell] == BOUNDARY):
+                        depths[cell] = max(depths[cell], depth)
+
+    return index
+
+
+# Function to hash the shapefile (geometry, attributes and CRS files) for cache keys:
+def shapefile_hash(path):
+    sha = hashlib.sha1()
+    base = os.path.splitext(path)[0]
+    for extension in (".shp", ".shx", ".dbf", ".prj"):
+        if (os.path.exists(base + extension)):
+            with open(base + extension, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(chunk)
+    return sha.hexdigest()
+
+
+# Function to parse the tile cache filepath (stored next to the shapefile):
+def tile_cache_path(path, epsg, resolution=DEFAULT_RESOLUTION):
+    return "%s_%s_epsg%s_%d.tiles" % (os.path.splitext(path)[0], shapefile_hash(path)[:16], epsg, resolution)
+
+
+# Function to write tile index to a file:
+def save_tile_index(index, path):
+    depths = array("d", index.depths)
+    if (sys.byteorder == "big"):
+        depths.byteswap()   # Cache files are little endian
+    with open(path, "wb") as f:
+        f.write(TILE_HEADER.pack(TILE_MAGIC, TILE_VERSION, index.minx, index.miny, index.cellsize, index.ncols, index.nrows))
+        index.flags.tofile(f)
+        depths.tofile(f)
+
+
+# Function to read tile index from a file
+# Returns None if the file doesn't exist or isn't a valid tile cache
+def load_tile_index(path):
+    try:
+        with open(path, "rb") as f:
+            magic, version, minx, miny, cellsize, ncols, nrows = TILE_HEADER.unpack(f.read(TILE_HEADER.size))
+            if (magic != TILE_MAGIC or version != TILE_VERSION):
+                return None
+            flags = array("b")
+            depths = array("d")
+            flags.fromfile(f, ncols * nrows)
+            depths.fromfile(f, ncols * nrows)
+    except Exception:
+        return None
+
+    if (sys.byteorder == "big"):
+        depths.byteswap()
+    return TileIndex(minx, miny, cellsize, ncols, nrows, flags, depths)
+
+
+# Function to get tile index from cache, or build and cache it
+# Inputs:
+#   - Fairways (see build_tile_index), already in the target CRS
+#   - Shapefile path and target EPSG code (cache key)
+def get_tile_index(fairways, shapefile_path, epsg, resolution=DEFAULT_RESOLUTION):
+    cache_path = tile_cache_path(shapefile_path, epsg, resolution)
+    index = load_tile_index(cache_path)
+    if (index is None):
+        index = build_tile_index(fairways, resolution)
+        try:
+            save_tile_index(index, cache_path)
+        except Exception:
+            pass    # Caching is an optimization only, read-only directories are fine
+    return index
@@ -0,0 +1,278 @@
+# Python3
+# Geodesic distances, azimuths and areas on the ellipsoids of Datum_transformations.py
+#   - Vincenty's inverse formula, vectorized: whole arrays of point pairs per call, only the pairs that
+#     haven't converged yet are iterated
+#   - Nearly antipodal pairs where Vincenty doesn't converge fall back to pyproj.Geod (Karney) if pyproj is
+#     installed, otherwise to a great circle on a sphere (with a warning)
+#   - Track lengths: short segments (most of a sounding track) use the chord + arc correction without
+#     iterating, the rest go through Vincenty
+#   - Distance matrices are calculated in blocks of rows to bound memory use
+#   - Polygon areas on the authalic sphere (equal area), also of rings around a pole
+# Running the script times the functions, tests/test_Geodesic.py compares the results with pyproj.
+
+import math
+import time
+import warnings
+
+import numpy as np
+
+from Datum_transformations import grs80, wgs84
+from Geodetic_calculations import first_eccentricity, geodetic_to_cartesian
+
+
+VINCENTY_TOLERANCE = 1e-12      # Radians, ~0.006 mm
+VINCENTY_ITERATIONS = 200
+CHORD_LIMIT = 10000.0           # Meters, longest track segment measured with the chord (error < 0.01 mm, 0.007 mm at 10 km)
+MATRIX_BLOCK = 1000000          # Elements per block of distance matrix calculations
+
+
+# Function to get flattening of an ellipsoid:
+def flattening(ellipsoid):
+    return (ellipsoid["a"] - ellipsoid["b"]) / ellipsoid["a"]
+
+
+# Great circle distance and azimuths on a sphere of the mean radius (fallback)
+#   - Inputs in radians, returns (distance, azimuth at point 1, azimuth at point 2), azimuths in radians
+def spherical_inverse(ellipsoid, lat1, lon1, lat2, lon2):
+    radius = (2 * ellipsoid["a"] + ellipsoid["b"]) / 3
+    dlon = lon2 - lon1
+    h = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    distance = 2 * radius * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+    azimuth1 = np.arctan2(np.sin(dlon) * np.cos(lat2), np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon))
+    azimuth2 = np.arctan2(np.sin(dlon) * np.cos(lat1), -np.sin(lat1) * np.cos(lat2) + np.cos(lat1) * np.sin(lat2) * np.cos(dlon))
+    return (distance, azimuth1, azimuth2)
+
+
+# Distances and azimuths of pairs Vincenty couldn't handle (inputs in radians, azimuths returned in radians):
+def fallback_inverse(ellipsoid, lat1, lon1, lat2, lon2):
+    try:
+        from pyproj import Geod
+    except ImportError:
+        warnings.warn("Vincenty didn't converge for %d nearly antipodal point pairs and pyproj isn't installed, "
+                      "spherical distances are used for them" % lat1.size, RuntimeWarning, stacklevel = 3)
+        return spherical_inverse(ellipsoid, lat1, lon1, lat2, lon2)
+
+    geod = Geod(a = ellipsoid["a"], b = ellipsoid["b"])
+    azimuth1, back_azimuth, distance = geod.inv(np.degrees(lon1), np.degrees(lat1), np.degrees(lon2), np.degrees(lat2))
+    return (np.asarray(distance), np.radians(azimuth1), np.radians(np.asarray(back_azimuth) + 180))
+
+
+# Geodesic distance and azimuths between point pairs (Vincenty's inverse formula)
+#   - Inputs: latitudes & longitudes of points 1 and 2 (decimal degrees, scalars or arrays broadcast
+#     together), ellipsoid
+#   - Returns: (distance (m), forward azimuth at point 1, forward azimuth at point 2), azimuths in
+#     degrees [0, 360) clockwise from north
+def inverse(lat1, lon1, lat2, lon2, ellipsoid = grs80, tolerance = VINCENTY_TOLERANCE, max_iterations = VINCENTY_ITERATIONS):
+    a = ellipsoid["a"]
+    b = ellipsoid["b"]
+    f = flattening(ellipsoid)
+
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(*(np.radians(np.asarray(c, dtype = np.float64)) for c in (lat1, lon1, lat2, lon2)))
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = (c.ravel() for c in (lat1, lon1, lat2, lon2))
+
+    L = np.remainder(lon2 - lon1 + math.pi, 2 * math.pi) - math.pi      # Longitude difference on [-pi, pi)
+    U1 = np.arctan((1 - f) * np.tan(lat1))                             # Reduced latitudes
+    U2 = np.arctan((1 - f) * np.tan(lat2))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+
+    lam        = L.copy()
+    sin_sigma  = np.zeros_like(L)
+    cos_sigma  = np.ones_like(L)
+    sigma      = np.zeros_like(L)
+    cos2_alpha = np.ones_like(L)
+    cos_2sm    = np.zeros_like(L)
+    active     = np.arange(L.size)     # Pairs still iterated
+
+    for iteration in range(max_iterations):
+        if (active.size == 0):
+            break
+        l = lam[active]
+        sin_lam, cos_lam = np.sin(l), np.cos(l)
+        cu1, su1, cu2, su2 = cosU1[active], sinU1[active], cosU2[active], sinU2[active]
+
+        ss = np.hypot(cu2 * sin_lam, cu1 * su2 - su1 * cu2 * cos_lam)
+        cs = su1 * su2 + cu1 * cu2 * cos_lam
+        s  = np.arctan2(ss, cs)
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            sin_alpha = np.where(ss > 0, cu1 * cu2 * sin_lam / ss, 0.0)        # Coincident points: 0
+            c2a = 1 - sin_alpha**2
+            c2sm = np.where(c2a > 0, cs - 2 * su1 * su2 / c2a, 0.0)           # Equatorial line: 0
+        C = f / 16 * c2a * (4 + f * (4 - 3 * c2a))
+        new = L[active] + (1 - C) * f * sin_alpha * (s + C * ss * (c2sm + C * cs * (-1 + 2 * c2sm**2)))
+
+        sin_sigma[active], cos_sigma[active], sigma[active] = ss, cs, s
+        cos2_alpha[active], cos_2sm[active], lam[active] = c2a, c2sm, new
+        active = active[(np.abs(new - l) > tolerance) & (np.abs(new) <= math.pi)]
+
+    # Diverged (|lambda| > pi) or unconverged pairs:
+    failed = np.flatnonzero(np.abs(lam) > math.pi)
+    failed = np.union1d(failed, active)
+
+    u2 = cos2_alpha * (a**2 - b**2) / b**2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sm + B / 4 * (cos_sigma * (-1 + 2 * cos_2sm**2)
+                  - B / 6 * cos_2sm * (-3 + 4 * sin_sigma**2) * (-3 + 4 * cos_2sm**2)))
+    distance = b * A * (sigma - delta_sigma)
+
+    sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+    azimuth1 = np.arctan2(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+    azimuth2 = np.arctan2(cosU1 * sin_lam, -sinU1 * cosU2 + cosU1 * sinU2 * cos_lam)
+
+    if (failed.size > 0):
+        distance[failed], azimuth1[failed], azimuth2[failed] = fallback_inverse(ellipsoid, lat1[failed], lon1[failed],
+                                                                                lat2[failed], lon2[failed])
+
+    return (distance.reshape(shape), to_azimuth(azimuth1).reshape(shape), to_azimuth(azimuth2).reshape(shape))
+
+
+# Function to convert azimuths in radians to degrees on [0, 360) (tiny negative angles would round to 360):
+def to_azimuth(azimuth):
+    azimuth = np.degrees(azimuth) % 360
+    return np.where(azimuth >= 360.0, 0.0, azimuth)
+
+
+# Geodesic distances between point pairs (see inverse):
+def distance(lat1, lon1, lat2, lon2, ellipsoid = grs80):
+    return inverse(lat1, lon1, lat2, lon2, ellipsoid)[0]
+
+
+# Segment lengths of a track (consecutive vertices)
+#   - Segments shorter than chord_limit: 3D chord + arc correction chord³ / (24 R²) with the Gaussian mean
+#     radius of the segment's mid latitude, no iteration. The rest are calculated with Vincenty.
+#   - Returns: array of len(lats) - 1 segment lengths (m)
+def segment_lengths(lats, lons, ellipsoid = grs80, chord_limit = CHORD_LIMIT):
+    lats = np.asarray(lats, dtype = np.float64)
+    lons = np.asarray(lons, dtype = np.float64)
+    if (lats.size < 2):
+        return np.zeros(0)
+
+    x, y, z = geodetic_to_cartesian(ellipsoid, lats, lons, 0.0)
+    chord = np.sqrt(np.diff(x)**2 + np.diff(y)**2 + np.diff(z)**2)
+
+    a  = ellipsoid["a"]
+    e2 = first_eccentricity(ellipsoid)
+    sin2 = np.sin(np.radians((lats[:-1] + lats[1:]) / 2))**2
+    radius2 = a**2 * (1 - e2) / (1 - e2 * sin2)**2      # Gaussian mean radius squared, M * N
+    lengths = chord + chord**3 / (24 * radius2)
+
+    long_segments = np.flatnonzero(chord >= chord_limit)
+    if (long_segments.size > 0):
+        lengths[long_segments] = distance(lats[long_segments], lons[long_segments],
+                                          lats[long_segments + 1], lons[long_segments + 1], ellipsoid)
+    return lengths
+
+
+# Length of a track (m), see segment_lengths:
+def track_length(lats, lons, ellipsoid = grs80, chord_limit = CHORD_LIMIT):
+    return math.fsum(segment_lengths(lats, lons, ellipsoid, chord_limit))
+
+
+# Distance matrix between two point sets (or a set and itself)
+#   - Returns: array of shape (len(lats1), len(lats2)), distances (m)
+#   - Rows are calculated in blocks of about block_size elements, temporary arrays stay that size
+#     whatever the size of the matrix is. Use out (e.g. a np.memmap) for matrices not fitting in memory.
+def distance_matrix(lats1, lons1, lats2 = None, lons2 = None, ellipsoid = grs80, block_size = MATRIX_BLOCK, out = None):
+    lats1 = np.ravel(np.asarray(lats1, dtype = np.float64))
+    lons1 = np.ravel(np.asarray(lons1, dtype = np.float64))
+    lats2 = lats1 if lats2 is None else np.ravel(np.asarray(lats2, dtype = np.float64))
+    lons2 = lons1 if lons2 is None else np.ravel(np.asarray(lons2, dtype = np.float64))
+
+    if (out is None):
+        out = np.empty((lats1.size, lats2.size))
+    rows = max(1, block_size // max(lats2.size, 1))
+    for start in range(0, lats1.size, rows):
+        end = min(start + rows, lats1.size)
+        out[start:end] = distance(lats1[start:end, None], lons1[start:end, None], lats2[None, :], lons2[None, :], ellipsoid)
+    return out
+
+
+# Function to get authalic (equal area) sphere radius of an ellipsoid:
+def authalic_radius(ellipsoid):
+    a = ellipsoid["a"]
+    e2 = first_eccentricity(ellipsoid)
+    e = math.sqrt(e2)
+    return math.sqrt(a**2 / 2 * (1 + (1 - e2) / e * math.atanh(e)))
+
+
+# Function to convert geodetic latitudes (decimal degrees) to authalic latitudes (radians):
+def authalic_latitude(lat, ellipsoid = grs80):
+    e2 = first_eccentricity(ellipsoid)
+    e = math.sqrt(e2)
+
+    def q(sin_lat):
+        return (1 - e2) * (sin_lat / (1 - e2 * sin_lat**2) + np.arctanh(e * sin_lat) / e)
+
+    return np.arcsin(np.clip(q(np.sin(np.radians(lat))) / q(1.0), -1, 1))
+
+
+# Area of a ring on the ellipsoid (m²)
+#   - Vertices are mapped to the authalic sphere (same area as the ellipsoid) and the spherical excess of
+#     the ring is summed edge by edge. Edges are great circles on that sphere instead of ellipsoidal
+#     geodesics: relative difference is ~1e-8 for a polygon of 100 km, a few ppm for 1000 km and ~1e-4 for
+#     edges of 1500 km near a pole.
+#   - Ring may be open or closed. Returns signed area of the region on the left of the ring: positive =
+#     counterclockwise. Like pyproj, the area is reduced to [-half, half] of the ellipsoid area, so a clockwise
+#     ring gives minus the area it encloses.
+#   - Rings around a pole (longitudes sum up to ±360°) are supported: excess summed edge by edge is then
+#     relative to the equator and is shifted by a hemisphere (2π). Edges must span less than 180° of longitude.
+def ring_area(lats, lons, ellipsoid = grs80):
+    beta = authalic_latitude(lats, ellipsoid)
+    lam  = np.radians(np.asarray(lons, dtype = np.float64))
+    if (beta.size < 3):
+        return 0.0
+
+    t1 = np.tan(beta / 2)
+    t2 = np.roll(t1, -1)
+    dlam = np.remainder(np.roll(lam, -1) - lam + math.pi, 2 * math.pi) - math.pi
+    excess = -math.fsum(2 * np.arctan2(np.tan(dlam / 2) * (t1 + t2), 1 + t1 * t2))
+    if (round(math.fsum(dlam) / (2 * math.pi)) != 0):
+        excess += 2 * math.pi       # Ring around a pole
+    excess = 2 * math.pi - (2 * math.pi - excess) % (4 * math.pi)      # Reduce to (-2π, 2π]
+    return excess * authalic_radius(ellipsoid)**2
+
+
+# Area of a polygon with holes on the ellipsoid (m²)
+#   - Inputs: exterior ring (lats, lons), list of hole rings [(lats, lons), ...]
+def polygon_area(lats, lons, holes = (), ellipsoid = grs80):
+    area = abs(ring_area(lats, lons, ellipsoid))
+    for hole_lats, hole_lons in holes:
+        area -= abs(ring_area(hole_lats, hole_lons, ellipsoid))
+    return area
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(1)
+
+    # Random pairs around the world + a few nearly antipodal ones:
+    n = 200000
+    lat1, lon1 = rng.uniform(-89, 89, n), rng.uniform(-180, 180, n)
+    lat2, lon2 = rng.uniform(-89, 89, n), rng.uniform(-180, 180, n)
+    lat2[:5], lon2[:5] = -lat1[:5] + 0.0005, lon1[:5] + 179.7
+
+    started = time.perf_counter()
+    d, az1, az2 = inverse(lat1, lon1, lat2, lon2, wgs84)
+    print("Vincenty, %d pairs: %.1f ms" % (n, 1000 * (time.perf_counter() - started)))
+
+    # Random walk track of 1 million vertices (~5 m steps) near Helsinki:
+    m = 1000000
+    track_lats = 60.15 + np.cumsum(rng.normal(0, 0.00004, m))
+    track_lons = 24.95 + np.cumsum(rng.normal(0, 0.00008, m))
+    started = time.perf_counter()
+    length = track_length(track_lats, track_lons)
+    print("Track length, %d vertices: %.3f km, %.1f ms" % (m, length / 1000, 1000 * (time.perf_counter() - started)))
+
+    started = time.perf_counter()
+    matrix = distance_matrix(track_lats[:2000], track_lons[:2000])
+    print("Distance matrix %s: %.1f ms" % (matrix.shape, 1000 * (time.perf_counter() - started)))
+
+    # Finland's rough outline (Åland to Utsjoki) for an area example:
+    ring = ([59.8, 60.4, 62.5, 64.5, 65.8, 68.5, 69.0, 70.1, 69.0, 68.0, 66.5, 64.0, 61.5, 60.5],
+            [22.0, 21.0, 21.2, 24.5, 24.2, 20.8, 20.6, 27.9, 28.8, 30.0, 29.1, 30.0, 29.5, 27.5])
+    print("Polygon area: %.0f km²" % (polygon_area(*ring) / 1e6))
@@ -0,0 +1,176 @@
+# Python3
+# Array versions of the Geodetic_calculations.c tools:
+#   - DMS <-> DD conversions, normal gravity (GRS80), geodetic <-> 3D cartesian coordinates,
+#     UTM scale error by easting and at a point
+#   - All functions take scalars or numpy arrays (any shape, broadcast together) and process whole
+#     arrays per call, e.g. per-point scale errors of a whole survey
+#   - Ellipsoids are the ones of Datum_transformations.py
+# Running the script times the functions with a million points, tests/test_Geodetic_calculations.py checks
+# the results against reference values of the C implementation and pyproj.
+
+import math
+import time
+
+import numpy as np
+
+from Datum_transformations import grs80
+
+
+UTM_FALSE_EASTING = 500000.0
+UTM_K0            = 0.9996      # UTM scale factor on the central meridian
+
+
+# Function to get first eccentricity squared of an ellipsoid (calculated if not given in papers):
+def first_eccentricity(ellipsoid):
+    a = ellipsoid["a"]
+    b = ellipsoid["b"]
+    return (a**2 - b**2) / a**2 if ellipsoid["e2"] is None else ellipsoid["e2"]
+
+
+# DMS (Degrees Minutes Seconds) to DD.DDD (Decimal degrees)
+#   - Sign is taken from degrees, like in the C version. Use -0.0 degrees for negative values under one degree.
+def dms_to_dd(degrees, minutes, seconds):
+    degrees = np.asarray(degrees, dtype = np.float64)
+    return np.copysign(np.abs(degrees) + (np.asarray(minutes) + np.asarray(seconds) / 60) / 60, degrees)
+
+
+# DD.DDD (Decimal degrees) to DMS (Degrees Minutes Seconds)
+#   - Returns: (degrees, minutes, seconds) arrays. Minutes are integers, seconds that round to 60 are carried
+#     over like in the C version.
+#   - Degrees carry the sign and are returned as floats, so that negative values under one degree keep their
+#     sign (-0.0)
+def dd_to_dms(decimal_degrees):
+    decimal_degrees = np.asarray(decimal_degrees, dtype = np.float64)
+    value   = np.abs(decimal_degrees)
+    degrees = np.floor(value)
+    minutes = np.floor(60 * (value - degrees))
+    seconds = 3600 * (value - degrees) - minutes * 60
+
+    carry = np.abs(seconds - 60) < 0.0000000001
+    minutes = np.where(carry, minutes + 1, minutes)
+    seconds = np.where(carry, 0.0, seconds)
+    carry = minutes == 60
+    degrees = np.where(carry, degrees + 1, degrees)
+    minutes = np.where(carry, 0.0, minutes)
+
+    return (np.copysign(degrees, decimal_degrees), minutes.astype(np.int64), seconds)
+
+
+# Normal (theoretical) gravity on GRS80 ellipsoid
+#   - Input: latitude (decimal degrees)
+#   - Returns: normal gravity in mGal (divide by 100000 for m/s²)
+def normal_gravity(latitude):
+    sin2 = np.sin(np.radians(latitude))**2
+    return 978032.67715 * (1 + sin2 * (0.0052790414 + sin2 * (0.0000232718 + sin2 * (0.0000001262 + sin2 * 0.0000000007))))
+
+
+# Geodetic coordinates (decimal degrees, ellipsoidal height) to 3D cartesian coordinates:
+def geodetic_to_cartesian(ellipsoid, lat, lon, height):
+    a = ellipsoid["a"]      # Semimajor axis
+    b = ellipsoid["b"]      # Semiminor axis
+
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    cos_latitude = np.cos(lat)
+    sin_latitude = np.sin(lat)
+
+    n = a**2 / np.sqrt(a**2 * cos_latitude**2 + b**2 * sin_latitude**2)
+    xcoord = (n + height) * cos_latitude * np.cos(lon)
+    ycoord = (n + height) * cos_latitude * np.sin(lon)
+    zcoord = (b**2 / a**2 * n + height) * sin_latitude
+
+    return (xcoord, ycoord, zcoord)
+
+
+# 3D cartesian coordinates to geodetic coordinates
+#   - Same iteration as in the C version, all points are iterated together until the largest height
+#     change is below tolerance (meters) or stops decreasing (rounding errors of large coordinates)
+#   - Returns: (latitude, longitude, ellipsoidal height, number of iterations)
+def cartesian_to_geodetic(ellipsoid, xcoord, ycoord, zcoord, tolerance = 0.0000000001, max_iterations = 100):
+    a  = ellipsoid["a"]     # Semimajor axis
+    b  = ellipsoid["b"]     # Semiminor axis
+    e2 = first_eccentricity(ellipsoid)
+
+    xcoord, ycoord, zcoord = np.broadcast_arrays(*(np.asarray(c, dtype = np.float64) for c in (xcoord, ycoord, zcoord)))
+    longitude = np.degrees(np.arctan2(ycoord, xcoord))
+    p = np.hypot(xcoord, ycoord)        # Distance from the polar axis
+
+    # 1st approximations of latitude, N and h:
+    lat_radians = np.arctan(zcoord / ((1 - e2) * p))
+    n = a**2 / np.sqrt(a**2 * np.cos(lat_radians)**2 + b**2 * np.sin(lat_radians)**2)
+    height = p / np.cos(lat_radians) - n
+
+    count = 0
+    change = math.inf
+    while (count < max_iterations):
+        lat_radians = np.arctan(zcoord / ((1 - e2 * (n / (n + height))) * p))
+        n = a**2 / np.sqrt(a**2 * np.cos(lat_radians)**2 + b**2 * np.sin(lat_radians)**2)
+        previous = height
+        height = p / np.cos(lat_radians) - n
+        count += 1
+        if (height.size == 0):
+            break
+        last_change, change = change, np.max(np.abs(height - previous))
+        if (change <= tolerance or change >= last_change):
+            break       # Converged, or changes are down to rounding errors
+
+    return (np.degrees(lat_radians), longitude, height, count)
+
+
+# UTM scale error based on distance from the central meridian (same approximation as in the C version)
+#   - Input: easting (meters)
+#   - Returns: scale error, e.g. -0.0004 = -400 PPM
+def utm_scale_error_distance(easting):
+    return -0.0004 + 12.29e-15 * (np.asarray(easting, dtype = np.float64) - UTM_FALSE_EASTING)**2
+
+
+# Function to get central meridian of the UTM zone of longitudes (decimal degrees):
+def utm_central_meridian(lon):
+    zone = np.clip(np.floor((np.asarray(lon) + 180) / 6) + 1, 1, 60)
+    return zone * 6 - 183
+
+
+# UTM scale error at a point
+#   - Inputs: latitude, longitude (decimal degrees), ellipsoid, central meridian (default: of the UTM zone of
+#     each point, set it to use one zone for the whole survey)
+#   - Transverse Mercator point scale factor series (Snyder 1987, eq. 8-12), error = k - 1
+def utm_scale_error_at_point(lat, lon, ellipsoid = grs80, central_meridian = None):
+    e2 = first_eccentricity(ellipsoid)
+    ep2 = e2 / (1 - e2)                 # Second eccentricity squared
+    if (central_meridian is None):
+        central_meridian = utm_central_meridian(lon)
+
+    lat = np.radians(lat)
+    cos_lat = np.cos(lat)
+    t = np.tan(lat)**2
+    c = ep2 * cos_lat**2
+    a2 = (np.radians(np.asarray(lon) - central_meridian) * cos_lat)**2
+
+    k = UTM_K0 * (1 + (1 + c) * a2 / 2 + (5 - 4 * t + 42 * c + 13 * c**2 - 28 * ep2) * a2**2 / 24
+                  + (61 - 148 * t + 16 * t**2) * a2**3 / 720)
+    return k - 1
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+if __name__ == "__main__":
+    # Scale error at a point vs. by easting, 100 km east of the central meridian (27°E) on latitude 60°:
+    lat, lon, height = 60.0, 27.0 + math.degrees(100000 / (6381000 * math.cos(math.radians(60)))), 0.0
+    print("Scale error at (%.4f, %.4f): %.2f PPM, by easting (~600 km): %.2f PPM"
+          % (lat, lon, utm_scale_error_at_point(lat, lon) * 1e6, utm_scale_error_distance(600000) * 1e6))
+
+    # Timing with a million points:
+    rng  = np.random.default_rng(1)
+    lats = rng.uniform(59.0, 70.0, 1000000)
+    lons = rng.uniform(19.0, 32.0, 1000000)
+    print("\nTiming, %d points per call:" % lats.size)
+    for name, function in (("dd_to_dms",                lambda: dd_to_dms(lats)),
+                           ("normal_gravity",           lambda: normal_gravity(lats)),
+                           ("geodetic_to_cartesian",    lambda: geodetic_to_cartesian(grs80, lats, lons, 0.0)),
+                           ("cartesian_to_geodetic",    lambda: cartesian_to_geodetic(grs80, *geodetic_to_cartesian(grs80, lats, lons, 0.0))),
+                           ("utm_scale_error_at_point", lambda: utm_scale_error_at_point(lats, lons, central_meridian = 27.0))):
+        started = time.perf_counter()
+        function()
+        print("%-28s %8.1f ms" % (name, 1000 * (time.perf_counter() - started)))
@@ -0,0 +1,387 @@
+# Shared WKT/WKB geometry codec
+# Pure Python3, no dependencies
+# See https://en.wikipedia.org/wiki/Well-known_text_representation_of_geometry
+#   - WKT is parsed in a single pass straight into a packed float array (array('d')), no tuple per vertex
+#     (numpy.frombuffer(geometry.coords) gives a zero-copy NumPy view if needed)
+#   - WKB (ISO & EWKB flavours) is read and written with bulk array copies
+#   - POINT, LINESTRING, POLYGON, MULTIPOINT, MULTILINESTRING & MULTIPOLYGON, optional Z/M values
+#   - Invalid input raises GeometryError
+
+import re
+import struct
+import sys
+from array import array
+
+
+# Raised for invalid or unsupported geometries:
+class GeometryError(ValueError):
+    pass
+
+
+# Geometry types: WKB type code & nesting depth of coordinate lists in WKT
+GEOMETRY_TYPES = {"POINT":           (1, 1),
+                  "LINESTRING":      (2, 1),
+                  "POLYGON":         (3, 2),
+                  "MULTIPOINT":      (4, 2),
+                  "MULTILINESTRING": (5, 2),
+                  "MULTIPOLYGON":    (6, 3)}
+WKB_TYPES = {code: name for name, (code, nesting) in GEOMETRY_TYPES.items()}
+
+# EWKB (PostGIS) type flags:
+EWKB_Z = 0x80000000
+EWKB_M = 0x40000000
+EWKB_SRID = 0x20000000
+
+_HEADER = re.compile(r"\s*([A-Za-z]+)\s*(ZM|Z|M)?\s*(EMPTY\s*$)?", re.IGNORECASE)
+_PARENS = re.compile(r"([()])")
+LITTLE_ENDIAN_HOST = (sys.byteorder == "little")
+
+
+# Geometry with packed coordinates
+#   - coords:          flat coordinate array (x0, y0, [z0, m0,] x1, y1, ...), `dims` values per vertex
+#   - ring_offsets:    start vertex of each ring/part + end, e.g. polygon with a hole: [0, 5, 9]
+#                      (points of a MULTIPOINT and lines of a MULTILINESTRING are parts too)
+#   - polygon_offsets: start ring of each polygon + end (polygons only), e.g. MULTIPOLYGON: [0, 2, 3]
+class Geometry:
+    def __init__(self, geom_type, coords=None, ring_offsets=None, polygon_offsets=None, has_z=False, has_m=False):
+        self.geom_type = geom_type
+        self.coords = coords if coords is not None else array("d")
+        self.has_z = has_z
+        self.has_m = has_m
+        self.dims = 2 + has_z + has_m
+        self.ring_offsets = ring_offsets if ring_offsets is not None else array("i", [0, len(self.coords) // self.dims])
+        if (polygon_offsets is None and geom_type in ("POLYGON", "MULTIPOLYGON")):
+            polygon_offsets = array("i", [0, len(self.ring_offsets) - 1])
+        self.polygon_offsets = polygon_offsets
+
+    def __repr__(self):
+        return "<Geometry %s: %d vertices>" % (self.geom_type, len(self))
+
+    def __len__(self):
+        return len(self.coords) // self.dims
+
+    @property
+    def is_empty(self):
+        return len(self.coords) == 0
+
+    # X and Y coordinate arrays
+    @property
+    def xs(self):
+        return self.coords[0::self.dims]
+
+    @property
+    def ys(self):
+        return self.coords[1::self.dims]
+
+    # Bounding box (min x, min y, max x, max y), None for empty geometries
+    @property
+    def bbox(self):
+        if (self.is_empty):
+            return None
+        xs, ys = self.xs, self.ys
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    # Coordinates of each ring/part as flat arrays
+    def rings(self):
+        d = self.dims
+        offsets = self.ring_offsets
+        return [self.coords[d * offsets[i]:d * offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    # Vertices of each ring/part as point tuples ((x,y), (x,y), ...), for point-based algorithms
+    def vertices(self):
+        d = self.dims
+        return [list(zip(ring[0::d], ring[1::d])) for ring in self.rings()]
+
+    # Vertices of each polygon as lists of rings (exterior first)
+    def polygons(self):
+        if (self.polygon_offsets is None):
+            raise GeometryError("%s is not a polygon geometry." % self.geom_type)
+        rings = self.vertices()
+        offsets = self.polygon_offsets
+        return [rings[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+# # # # # # # #
+#     WKT     #
+# # # # # # # #
+
+# Function to parse WKT to a Geometry
+# Inputs:
+#   - WKT string, e.g. "LineString (0 0, 1 1)", "POLYGON Z ((0 0 1, 1 0 1, 1 1 1, 0 0 1))", "MULTIPOINT EMPTY"
+# Returns:
+#   - Geometry
+# Raises:
+#   - GeometryError for unsupported types and malformed input
+def parse_wkt(wkt):
+    header = _HEADER.match(wkt)
+    if (header is None):
+        raise GeometryError("Invalid WKT: %.40s" % wkt)
+    geom_type = header.group(1).upper()
+    if (geom_type not in GEOMETRY_TYPES):
+        raise GeometryError("Unsupported geometry type: %s" % header.group(1))
+    tag = (header.group(2) or "").upper()
+    has_z = "Z" in tag
+    has_m = "M" in tag
+    if (header.group(3) is not None):
+        return Geometry(geom_type, array("d"), array("i", [0]), array("i", [0]) if "POLYGON" in geom_type else None, has_z, has_m)
+
+    nesting = GEOMETRY_TYPES[geom_type][1]
+    body = wkt[header.end():]
+    if (geom_type == "MULTIPOINT" and body.lstrip()[1:].lstrip()[:1] != "("):
+        nesting = 1     # MULTIPOINT (1 2, 3 4) form, each vertex is a part
+
+    coords = array("d")
+    ring_offsets = array("i")
+    polygon_offsets = array("i") if "POLYGON" in geom_type else None
+    dims = 2 + has_z + has_m if tag else None   # Dimension inferred from the first vertex if not tagged
+    depth = 0
+    vertex_count = 0
+    closed = False
+
+    # Single pass over parenthesis-separated segments, coordinate lists are converted in bulk:
+    for segment in _PARENS.split(body):
+        if (segment == "("):
+            if (closed):
+                raise GeometryError("Unexpected text after geometry.")
+            depth += 1
+            if (depth > nesting):
+                raise GeometryError("Too deeply nested %s." % geom_type)
+            if (depth == nesting - 1 and polygon_offsets is not None):
+                polygon_offsets.append(len(ring_offsets))
+        elif (segment == ")"):
+            depth -= 1
+            if (depth < 0):
+                raise GeometryError("Unbalanced parentheses.")
+            closed = (depth == 0)
+        elif (depth == nesting and not closed):
+            values = segment.replace(",", " ").split()
+            vertices = segment.count(",") + 1
+            if (dims is None):
+                dims = len(segment.split(",", 1)[0].split())
+                if (dims < 2 or dims > 4):
+                    raise GeometryError("Invalid coordinate dimension: %d" % dims)
+                has_z = dims >= 3
+                has_m = dims == 4
+            if (len(values) != dims * vertices):
+                raise GeometryError("Invalid coordinates: %.40s" % segment.strip())
+            try:
+                coords.extend(map(float, values))
+            except ValueError:
+                raise GeometryError("Invalid coordinate value: %.40s" % segment.strip())
+            if (nesting == 1 and geom_type == "MULTIPOINT"):
+                ring_offsets.extend(range(vertex_count, vertex_count + vertices))
+            else:
+                ring_offsets.append(vertex_count)
+            vertex_count += vertices
+        elif (segment.strip(" \t\r\n,")):
+            raise GeometryError("Unexpected text in WKT: %.40s" % segment.strip())
+
+    if (depth != 0 or not closed):
+        raise GeometryError("Unbalanced parentheses.")
+    if (geom_type == "POINT" and vertex_count != 1):
+        raise GeometryError("POINT must have exactly one vertex.")
+
+    ring_offsets.append(vertex_count)
+    if (polygon_offsets is not None):
+        polygon_offsets.append(len(ring_offsets) - 1)
+    return Geometry(geom_type, coords, ring_offsets, polygon_offsets, has_z, has_m)
+
+
+# Function to format coordinates of a ring/part to WKT: "x y, x y, ..."
+def _format_coords(coords, dims):
+    vertex_format = " ".join(["%r"] * dims)
+    return ", ".join(map(vertex_format.__mod__, zip(*[coords[k::dims] for k in range(dims)])))
+
+
+# Function to format a Geometry as WKT:
+def to_wkt(geometry):
+    geom_type = geometry.geom_type
+    tag = " " + ("Z" if geometry.has_z else "") + ("M" if geometry.has_m else "") if (geometry.has_z or geometry.has_m) else ""
+    if (geometry.is_empty):
+        return geom_type + tag + " EMPTY"
+
+    rings = ["(" + _format_coords(ring, geometry.dims) + ")" for ring in geometry.rings()]
+    if (geom_type in ("POINT", "LINESTRING")):
+        body = rings[0]
+    elif (geom_type == "MULTIPOLYGON"):
+        offsets = geometry.polygon_offsets
+        body = "(" + ", ".join("(" + ", ".join(rings[offsets[i]:offsets[i + 1]]) + ")" for i in range(len(offsets) - 1)) + ")"
+    else:
+        body = "(" + ", ".join(rings) + ")"
+    return geom_type + tag + " " + body
+
+
+# Functions to build geometries from point tuples:
+def point(x, y):
+    return Geometry("POINT", array("d", (x, y)))
+
+
+def linestring(vertices):
+    coords = array("d")
+    for v in vertices:
+        coords.extend(v[:2])
+    return Geometry("LINESTRING", coords)
+
+
+def polygon(rings):
+    coords = array("d")
+    ring_offsets = array("i", [0])
+    for ring in rings:
+        for v in ring:
+            coords.extend(v[:2])
+        ring_offsets.append(len(coords) // 2)
+    return Geometry("POLYGON", coords, ring_offsets)
+
+
+# Function to format point tuples ((x,y), (x,y), ...) as a WKT Linestring:
+def linestring_wkt(vertices):
+    return "LINESTRING (" + ", ".join(map("%r %r".__mod__, ((v[0], v[1]) for v in vertices))) + ")"
+
+
+# Function to parse a WKT geometry of an expected type:
+#   - Input: WKT and allowed geometry type(s)
+#   - Output: Geometry, GeometryError if the type doesn't match
+def parse_wkt_as(wkt, *geom_types):
+    geometry = parse_wkt(wkt)
+    if (geometry.geom_type not in geom_types):
+        raise GeometryError("Invalid geometry type %s, expected %s." % (geometry.geom_type, " or ".join(geom_types)))
+    return geometry
+
+
+# Function to parse a WKT Linestring to point tuples ((x,y), (x,y), ...), for the line tools:
+#   - GeometryError for other geometry types and empty Linestrings
+def parse_linestring_vertices(wkt):
+    geometry = parse_wkt_as(wkt, "LINESTRING")
+    if (geometry.is_empty):
+        raise GeometryError("Empty LINESTRING.")
+    return geometry.vertices()[0]
+
+
+# # # # # # # #
+#     WKB     #
+# # # # # # # #
+
+# Function to read a packed coordinate block (count vertices) from WKB:
+def _read_coords(data, offset, count, dims, little_endian):
+    size = 8 * dims * count
+    if (offset + size > len(data)):
+        raise GeometryError("WKB is truncated.")
+    coords = array("d", data[offset:offset + size])
+    if (little_endian != LITTLE_ENDIAN_HOST):
+        coords.byteswap()
+    return coords, offset + size
+
+
+# Function to parse WKB (ISO or EWKB) to a Geometry:
+def parse_wkb(data):
+    data = bytes(data)
+    coords = array("d")
+    ring_offsets = array("i", [0])
+    polygon_offsets = array("i", [0])
+    state = {}
+
+    def read(offset, expected=None):
+        if (offset + 5 > len(data)):
+            raise GeometryError("WKB is truncated.")
+        little_endian = data[offset] == 1
+        order = "<" if little_endian else ">"
+        code = struct.unpack_from(order + "I", data, offset + 1)[0]
+        offset += 5
+        has_z = bool(code & EWKB_Z)
+        has_m = bool(code & EWKB_M)
+        if (code & EWKB_SRID):
+            offset += 4     # SRID is not kept
+        code &= 0x0FFFFFFF
+        has_z = has_z or (code // 1000) in (1, 3)
+        has_m = has_m or (code // 1000) in (2, 3)
+        geom_type = WKB_TYPES.get(code % 1000)
+        if (geom_type is None or (expected is not None and geom_type != expected)):
+            raise GeometryError("Unsupported or unexpected WKB geometry type: %d" % code)
+        dims = 2 + has_z + has_m
+        if (state.setdefault("dims", (has_z, has_m)) != (has_z, has_m)):
+            raise GeometryError("Mixed coordinate dimensions in WKB.")
+        state.setdefault("type", geom_type)
+
+        def count_at(position):
+            if (position + 4 > len(data)):
+                raise GeometryError("WKB is truncated.")
+            return struct.unpack_from(order + "I", data, position)[0], position + 4
+
+        def ring(position, count):
+            values, position = _read_coords(data, position, count, dims, little_endian)
+            coords.extend(values)
+            ring_offsets.append(len(coords) // dims)
+            return position
+
+        if (geom_type == "POINT"):
+            offset = ring(offset, 1)
+        elif (geom_type == "LINESTRING"):
+            count, offset = count_at(offset)
+            offset = ring(offset, count)
+        elif (geom_type == "POLYGON"):
+            count, offset = count_at(offset)
+            for i in range(count):
+                vertices, offset = count_at(offset)
+                offset = ring(offset, vertices)
+            polygon_offsets.append(len(ring_offsets) - 1)
+        else:
+            count, offset = count_at(offset)
+            member = {"MULTIPOINT": "POINT", "MULTILINESTRING": "LINESTRING", "MULTIPOLYGON": "POLYGON"}[geom_type]
+            for i in range(count):
+                offset = read(offset, member)
+        return offset
+
+    read(0)
+    geom_type = state["type"]
+    has_z, has_m = state["dims"]
+    if (geom_type == "POINT" and all(c != c for c in coords)):
+        coords = array("d")     # POINT EMPTY is written as NaN coordinates
+        ring_offsets = array("i", [0])
+    return Geometry(geom_type, coords, ring_offsets, polygon_offsets if "POLYGON" in geom_type else None, has_z, has_m)
+
+
+# Function to write a Geometry as (ISO) WKB
+#   - byteorder: "<" little endian (default) or ">" big endian
+def to_wkb(geometry, byteorder="<"):
+    little_endian = (byteorder == "<")
+    order_byte = b"\x01" if little_endian else b"\x00"
+    dims = geometry.dims
+    type_offset = 1000 * (1 if geometry.has_z and not geometry.has_m else 2 if geometry.has_m and not geometry.has_z else 3 if geometry.has_z else 0)
+    rings = geometry.rings()
+    out = []
+
+    def header(geom_type):
+        out.append(order_byte + struct.pack(byteorder + "I", GEOMETRY_TYPES[geom_type][0] + type_offset))
+
+    def coords(values, with_count=True):
+        if (little_endian != LITTLE_ENDIAN_HOST):
+            values = array("d", values)
+            values.byteswap()
+        if (with_count):
+            out.append(struct.pack(byteorder + "I", len(values) // dims))
+        out.append(values.tobytes())
+
+    geom_type = geometry.geom_type
+    header(geom_type)
+    if (geom_type == "POINT"):
+        coords(rings[0] if not geometry.is_empty else array("d", [float("nan")] * dims), False)
+    elif (geom_type == "LINESTRING"):
+        coords(rings[0] if rings else array("d"))
+    elif (geom_type == "POLYGON"):
+        out.append(struct.pack(byteorder + "I", len(rings)))
+        for ring in rings:
+            coords(ring)
+    elif (geom_type == "MULTIPOINT" or geom_type == "MULTILINESTRING"):
+        out.append(struct.pack(byteorder + "I", len(rings)))
+        for ring in rings:
+            header("POINT" if geom_type == "MULTIPOINT" else "LINESTRING")
+            coords(ring, geom_type == "MULTILINESTRING")
+    else:
+        offsets = geometry.polygon_offsets
+        out.append(struct.pack(byteorder + "I", len(offsets) - 1))
+        for i in range(len(offsets) - 1):
+            header("POLYGON")
+            out.append(struct.pack(byteorder + "I", offsets[i + 1] - offsets[i]))
+            for ring in rings[offsets[i]:offsets[i + 1]]:
+                coords(ring)
+    return b"".join(out)
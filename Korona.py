@@ -1,55 +1,320 @@
 # Get and print current number of COVID-19 infections and related deaths in Finland
+# The feed is streamed and parsed incrementally: records are counted one at a time as they arrive,
+# so memory use stays flat however long the feed grows.
+# The last response is cached locally: an unchanged feed costs one conditional request (304), a changed
+# feed only appends records newer than the cached ones to a compact on-disk store.
 
-import urllib3
+import argparse
+import codecs
 import json
-from datetime import datetime
-
-# Get up-to-date NCOV-19 data (Finland). Uses HS open data.
-try:
-    http = urllib3.PoolManager()
-    url = http.request('GET', 'https://w3qa5ydb4l.execute-api.eu-west-1.amazonaws.com/prod/finnishCoronaData/v2/')
-    data = json.loads(url.data)
-except Exception as e:
-    print("Could not get the data.\n")
-    exit()
-
-# Parse data:
-cases = {}
-deaths = {}
-
-try:
-    for i in range(len(data['confirmed'])):
-        timestamp = datetime.strptime(data['confirmed'][i]['date'], "%Y-%m-%dT%H:%M:%S.%fZ")
-        district = data['confirmed'][i]['healthCareDistrict']
-
-        if (district in cases.keys()):
-            cases[data['confirmed'][i]['healthCareDistrict']] += 1
-        else:
-            cases[data['confirmed'][i]['healthCareDistrict']] = 1
-        
-
-    for i in range(len(data['deaths'])):
-        timestamp = datetime.strptime(data['deaths'][i]['date'], "%Y-%m-%dT%H:%M:%S.%fZ")
-        district = data['deaths'][i]['healthCareDistrict']
-        if (data['deaths'][i]['healthCareDistrict'] in deaths.keys()):
-            deaths[data['deaths'][i]['healthCareDistrict']] += 1
+import os
+from collections import Counter
+
+import urllib3
+
+
+DATA_URL = 'https://w3qa5ydb4l.execute-api.eu-west-1.amazonaws.com/prod/finnishCoronaData/v2/'
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = " \t\r\n"
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "korona")
+
+
+# Incremental parser for the feed: {"confirmed": [{...}, ...], "deaths": [{...}, ...], ...}
+# Input:
+#   - Iterable of bytes chunks (UTF-8), e.g. a streamed HTTP response
+# Yields:
+#   - (section, record) pairs, e.g. ("confirmed", {"healthCareDistrict": "HUS", "date": ...})
+#   - Non-list values of the top level object are skipped
+# Raises:
+#   - ValueError on malformed data
+def iter_records(chunks):
+    chunks = iter(chunks)
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    json_decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    state = "start"     # start -> key -> colon -> value/array -> next -> key ... -> end
+    section = None
+
+    while True:
+        while (pos < len(buf) and buf[pos] in WHITESPACE):
+            pos += 1
+
+        # Decode a complete JSON value at pos, None if more data is needed:
+        value = None
+        end = None
+        if (pos < len(buf) and state in ("key", "value", "array") and buf[pos] not in "]}[,"):
+            try:
+                value, end = json_decoder.raw_decode(buf, pos)
+                if (end == len(buf) and not eof):
+                    end = None  # Number or literal may continue in the next chunk
+            except ValueError:
+                if (eof):
+                    raise ValueError("Malformed data near: %r" % buf[pos:pos + 100])
+
+        if (pos >= len(buf) or (end is None and state in ("key", "value", "array") and buf[pos] not in "]}[,")):
+            if (eof):
+                break
+            chunk = next(chunks, None)
+            if (chunk is None):
+                eof = True
+                buf = buf[pos:] + text_decoder.decode(b"", final=True)
+            else:
+                buf = buf[pos:] + text_decoder.decode(chunk)     # Drop parsed data, keeps the buffer small
+            pos = 0
+            continue
+
+        c = buf[pos]
+        if (state == "start" and c == "{"):
+            state = "key"
+            pos += 1
+        elif (state == "key" and c == "}"):
+            state = "end"
+            pos += 1
+        elif (state == "key" and isinstance(value, str)):
+            section = value
+            state = "colon"
+            pos = end
+        elif (state == "colon" and c == ":"):
+            state = "value"
+            pos += 1
+        elif (state == "value" and c == "["):
+            state = "array"
+            pos += 1
+        elif (state == "value" and end is not None):
+            state = "next"  # Skip other values
+            pos = end
+        elif (state == "array" and c == "]"):
+            state = "next"
+            pos += 1
+        elif (state == "array" and c == ","):
+            pos += 1
+        elif (state == "array" and end is not None):
+            pos = end
+            yield section, value
+        elif (state == "next" and c == ","):
+            state = "key"
+            pos += 1
+        elif (state == "next" and c == "}"):
+            state = "end"
+            pos += 1
         else:
-            deaths[data['deaths'][i]['healthCareDistrict']] = 1
+            raise ValueError("Malformed data near: %r" % buf[pos:pos + 100])
 
-    caselist  = sorted(cases, key=cases.get)[::-1]
-    casecount = sorted(cases.values())[::-1]
-    deathlist = sorted(deaths, key=deaths.get)[::-1]
-    deathcount = sorted(deaths.values())[::-1]
+    if (state != "end"):
+        raise ValueError("Unexpected end of data.")
 
-    # Print results:
-    print("\nTartunnat: (N=" + str(sum(casecount)) + ")\n------")
-    for i in range(0, len(caselist)):
-        print("%-18s %6d" % (caselist[i], casecount[i]))
 
-    if (sum(deathcount) > 0):
-        print("\n\nKuolleet: (N=" + str(sum(deathcount)) + ")\n------")
-        for i in range(0, len(deathlist)):
-            print("%-18s %6d" % (deathlist[i] if deathlist[i] is not None else "-", deathcount[i]))
+# Function to count records per health care district in a single pass
+# Input: (section, record) pairs, see iter_records
+# Returns: {section: Counter({district: count, ...}), ...}
+def count_by_district(records):
+    counts = {}
+    for section, record in records:
+        section_counts = counts.get(section)
+        if (section_counts is None):
+            section_counts = counts[section] = Counter()
+        section_counts[record.get('healthCareDistrict')] += 1
+    return counts
+
+
+# Sort key of rankings: count descending, ties by name (records without district first)
+def ranking_key(item):
+    return (-item[1], item[0] or "")
+
+
+# Function to rank districts by count (descending, ties by name)
+# Returns: [(district, count), ...] - names and counts stay paired
+def ranking(district_counts):
+    return sorted(district_counts.items(), key=ranking_key)
+
+
+# Function to stream the feed in chunks (uses HS open data):
+def stream_feed(http, url=DATA_URL):
+    response = http.request('GET', url, preload_content=False)
+    try:
+        if (response.status != 200):
+            raise IOError("HTTP status %d" % response.status)
+        for chunk in response.stream(CHUNK_SIZE):
+            yield chunk
+    finally:
+        response.release_conn()
+
+
+# Local cache of the feed
+#   - meta.json: ETag & Last-Modified of the cached response, per section maximum record date and
+#     district counts on that date, and the valid length of each section file
+#   - <section>.tsv: one "date<TAB>district" line per record, in arrival order
+# Records older than the cached maximum date are assumed unchanged (the feed only grows). Records on the
+# maximum date are compared by district counts, so late arrivals with the same timestamp aren't lost.
+class FeedCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, url=DATA_URL, http=None):
+        self.directory = directory
+        self.url = url
+        self.http = http if http is not None else urllib3.PoolManager()  # Reuse one pool for all requests
+        os.makedirs(directory, exist_ok=True)
+        self.meta = self._load_meta()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
 
-except Exception as e:
-    print("Data parsing error. Check incoming data sample:\n", url.data[:100])
+    # Read metadata and cut section files back to their committed length (interrupted updates)
+    def _load_meta(self):
+        try:
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"etag": None, "last_modified": None, "sections": {}}
+        self._rollback(meta)
+        return meta
+
+    # Cut section files back to the lengths committed in metadata
+    def _rollback(self, meta):
+        for name in os.listdir(self.directory):
+            if (name.endswith(".tsv")):
+                info = meta["sections"].get(name[:-4], {"length": 0})
+                path = self._path(name)
+                if (os.path.getsize(path) > info["length"]):
+                    with open(path, "r+b") as f:
+                        f.truncate(info["length"])
+
+    def _save_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._path("meta.json"))    # Atomic, store is consistent at all times
+
+    # Conditional request, appends new records to the store
+    # Returns: {section: number of records appended} - empty if the feed hasn't changed (304)
+    def update(self):
+        headers = {}
+        if (self.meta["etag"]):
+            headers["If-None-Match"] = self.meta["etag"]
+        if (self.meta["last_modified"]):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+
+        response = self.http.request('GET', self.url, headers=headers, preload_content=False)
+        try:
+            if (response.status == 304):
+                return {}
+            if (response.status != 200):
+                raise IOError("HTTP status %d" % response.status)
+            snapshot = json.loads(json.dumps(self.meta))
+            try:
+                appended = self._append(iter_records(response.stream(CHUNK_SIZE)))
+            except Exception:
+                self.meta = snapshot
+                self._rollback(self.meta)   # Drop partially appended records
+                raise
+        finally:
+            response.release_conn()
+
+        self.meta["etag"] = response.headers.get("ETag")
+        self.meta["last_modified"] = response.headers.get("Last-Modified")
+        self._save_meta()
+        return appended
+
+    # Append records newer than the cached snapshot to section files
+    def _append(self, records):
+        sections = self.meta["sections"]
+        latest = {}     # Section: [max date, Counter of districts on max date] in this response
+        on_cached_max = {}  # Section: Counter of districts on the cached maximum date in this response
+        files = {}
+        appended = Counter()
+
+        def write(section, date, district, count=1):
+            if (section not in files):
+                files[section] = open(self._path(section + ".tsv"), "a", encoding="utf-8")
+            files[section].write((date + "\t" + district + "\n") * count)
+            appended[section] += count
+
+        try:
+            for section, record in records:
+                date = record.get('date') or ""
+                district = record.get('healthCareDistrict') or ""
+
+                # Track max date & districts on it (string comparison, timestamps share the same ISO format):
+                top = latest.get(section)
+                if (top is None or date > top[0]):
+                    latest[section] = top = [date, Counter()]
+                if (date == top[0]):
+                    top[1][district] += 1
+
+                cached = sections.get(section)
+                if (cached is None or date > cached["max_date"]):
+                    write(section, date, district)
+                elif (date == cached["max_date"]):
+                    on_cached_max.setdefault(section, Counter())[district] += 1     # Decided after the whole response
+                # Older records are already in store
+
+            # Records on the cached maximum date that weren't there before:
+            for section, districts in on_cached_max.items():
+                cached = sections[section]
+                for district, count in (districts - Counter(cached["districts"])).items():
+                    write(section, cached["max_date"], district, count)
+        finally:
+            for f in files.values():
+                f.close()
+
+        # Commit new lengths and snapshot maximum dates:
+        for section, (date, districts) in latest.items():
+            path = self._path(section + ".tsv")
+            sections[section] = {"max_date": date, "districts": dict(districts),
+                                 "length": os.path.getsize(path) if os.path.exists(path) else 0}
+        return dict(appended)
+
+    # Stored records as (section, record) pairs, like iter_records
+    def records(self, section=None):
+        for name in ([section] if section is not None else sorted(self.meta["sections"])):
+            path = self._path(name + ".tsv")
+            if (not os.path.exists(path)):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    date, district = line.rstrip("\n").split("\t")
+                    yield name, {'date': date, 'healthCareDistrict': district or None}
+
+
+# Function to print ranking of districts:
+def print_ranking(title, district_counts):
+    rows = ranking(district_counts)
+    print("\n" + title + " (N=" + str(sum(district_counts.values())) + ")\n------")
+    for district, count in rows:
+        print("%-18s %6d" % (district if district is not None else "-", count))
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prints COVID-19 infections and deaths in Finland by health care district.")
+    parser.add_argument("--url", default=DATA_URL, help="data feed url")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="local cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="download and count the whole feed without caching")
+    options = parser.parse_args()
+
+    # Get and count up-to-date NCOV-19 data (Finland):
+    try:
+        if (options.no_cache):
+            counts = count_by_district(iter_records(stream_feed(urllib3.PoolManager(), options.url)))
+        else:
+            cache = FeedCache(options.cache_dir, options.url)
+            cache.update()
+            counts = count_by_district(cache.records())
+    except ValueError as e:
+        print("Data parsing error. Check incoming data:\n", e)
+        exit()
+    except Exception:
+        print("Could not get the data.\n")
+        exit()
+
+    cases = counts.get('confirmed', Counter())
+    deaths = counts.get('deaths', Counter())
+
+    # Print results:
+    print_ranking("Tartunnat:", cases)
+    if (sum(deaths.values()) > 0):
+        print_ranking("\nKuolleet:", deaths)
@@ -0,0 +1,230 @@
+# Per-district daily time-series index for the Korona data feed
+#   - Districts are coded as small integers, record dates as day offsets from the first day
+#   - Cumulative daily counts are precomputed per section and district, so range totals, rolling rates
+#     and top-N rankings are answered without rescanning the records:
+#       - total over any date range: O(1), top-N districts in a window: O(districts * log N)
+#   - The index is stored next to the feed cache and rebuilt only when the cache has changed
+
+import heapq
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from datetime import date, timedelta
+
+from Korona import DEFAULT_CACHE_DIR, FeedCache, ranking_key
+
+
+INDEX_MAGIC = b"KIDX"
+INDEX_FILE = "index.bin"
+DATE_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[T ]|$)")     # ISO date, optionally followed by time
+
+ALL = object()      # District argument for the total of all districts (None is the district of records without one)
+
+
+# Function to convert an ISO date or timestamp ("2020-03-20", "2020-03-20T10:00:00.000Z") or a date to a date:
+#   - ValueError for malformed dates
+def to_date(value):
+    if (isinstance(value, date)):
+        return value
+    match = DATE_PATTERN.match(value)
+    if (match is None):
+        raise ValueError("Invalid date: %r" % value)
+    return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+
+# Daily counts index
+#   - districts:  district names, list index = district code (None for records without district)
+#   - first_day:  date of day offset 0, days: number of days
+#   - cumulative: {section: array('q')}, row of (days + 1) values per district + one row for all districts
+#                 row[k] = number of records before day offset k
+#   - undated:    {section: number of records without date}, these aren't in the daily counts
+class DistrictIndex:
+    def __init__(self, districts, first_day, days, cumulative, signature=None, undated=None):
+        self.districts = districts
+        self.codes = {name: code for code, name in enumerate(districts)}
+        self.first_day = first_day
+        self.days = days
+        self.cumulative = cumulative
+        self.signature = signature  # Identifies the data the index was built from
+        self.undated = undated if undated is not None else {}
+
+    # Build index from (section, record) pairs in a single pass
+    #   - Records without date are only counted per section (undated)
+    @classmethod
+    def build(cls, records, signature=None):
+        codes = {}
+        day_cache = {}                  # Date text -> day ordinal, each distinct date is parsed only once
+        columns = {}                    # Section: (district codes array('H'), day ordinals array('i'))
+        undated = {}
+
+        for section, record in records:
+            text = (record.get('date') or "")[:10]
+            if (not text):
+                undated[section] = undated.get(section, 0) + 1
+                continue
+            column = columns.get(section)
+            if (column is None):
+                column = columns[section] = (array("H"), array("i"))
+            district = record.get('healthCareDistrict')
+            code = codes.get(district)
+            if (code is None):
+                code = codes[district] = len(codes)
+            ordinal = day_cache.get(text)
+            if (ordinal is None):
+                ordinal = day_cache[text] = to_date(text).toordinal()
+            column[0].append(code)
+            column[1].append(ordinal)
+
+        districts = sorted(codes, key=lambda name: codes[name])
+        if (not day_cache):
+            return cls(districts, date.today(), 0, {}, signature, undated)
+        first = min(day_cache.values())
+        days = max(day_cache.values()) - first + 1
+
+        # Daily counts -> cumulative sums, one row per district and a total row:
+        width = days + 1
+        cumulative = {}
+        for section, (district_codes, ordinals) in columns.items():
+            counts = array("q", bytes(8 * width * (len(districts) + 1)))
+            total_row = len(districts) * width
+            for code, ordinal in zip(district_codes, ordinals):
+                counts[code * width + ordinal - first + 1] += 1
+                counts[total_row + ordinal - first + 1] += 1
+            for row in range(0, len(counts), width):
+                running = 0
+                for k in range(row, row + width):
+                    running += counts[k]
+                    counts[k] = running
+            cumulative[section] = counts
+
+        return cls(districts, date.fromordinal(first), days, cumulative, signature, undated)
+
+    # Day offset of a date, clamped to [0, days]
+    def _offset(self, day):
+        return min(max((to_date(day) - self.first_day).days, 0), self.days)
+
+    def _row(self, section, district):
+        counts = self.cumulative.get(section)
+        if (counts is None):
+            return None, 0
+        if (district is ALL):
+            return counts, len(self.districts) * (self.days + 1)    # Total row
+        code = self.codes.get(district)
+        if (code is None):
+            return None, 0
+        return counts, code * (self.days + 1)
+
+    # Number of records on [start, end) (dates or ISO strings; None = open end), district ALL = all districts
+    def total(self, section, district=ALL, start=None, end=None):
+        counts, row = self._row(section, district)
+        if (counts is None):
+            return 0
+        a = 0 if start is None else self._offset(start)
+        b = self.days if end is None else self._offset(end)
+        return counts[row + b] - counts[row + a] if b > a else 0
+
+    # Average daily count of the window days ending on (and including) the given day
+    def rolling_rate(self, section, district=ALL, day=None, window=7):
+        last = to_date(day) if day is not None else self.first_day + timedelta(days=self.days - 1)
+        return self.total(section, district, last - timedelta(days=window - 1), last + timedelta(days=1)) / window
+
+    # Daily counts of [start, end) as a list
+    def daily(self, section, district=ALL, start=None, end=None):
+        counts, row = self._row(section, district)
+        a = 0 if start is None else self._offset(start)
+        b = self.days if end is None else self._offset(end)
+        if (counts is None):
+            return [0] * max(b - a, 0)
+        return [counts[row + k + 1] - counts[row + k] for k in range(a, b)]
+
+    # N districts with most records on [start, end): [(district, count), ...]
+    def top(self, section, n=10, start=None, end=None):
+        counts = self.cumulative.get(section)
+        if (counts is None):
+            return []
+        a = 0 if start is None else self._offset(start)
+        b = self.days if end is None else self._offset(end)
+        width = self.days + 1
+        totals = ((name, counts[code * width + b] - counts[code * width + a]) for code, name in enumerate(self.districts))
+        return heapq.nsmallest(n, (item for item in totals if item[1] > 0), key=ranking_key)     # Same order as ranking()
+
+    # Write index to a file: magic, JSON header length, JSON header, cumulative arrays (little endian)
+    def save(self, path):
+        sections = sorted(self.cumulative)
+        header = json.dumps({"districts": self.districts, "first_day": self.first_day.isoformat(), "days": self.days,
+                             "sections": sections, "signature": self.signature, "undated": self.undated}).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC + struct.pack("<I", len(header)) + header)
+            for section in sections:
+                counts = array("q", self.cumulative[section])
+                if (sys.byteorder == "big"):
+                    counts.byteswap()
+                f.write(counts.tobytes())
+        os.replace(tmp, path)
+
+    # Read index from a file, None if missing or invalid
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if (data[:4] != INDEX_MAGIC):
+                return None
+            length = struct.unpack_from("<I", data, 4)[0]
+            header = json.loads(data[8:8 + length].decode("utf-8"))
+        except (OSError, ValueError, struct.error):
+            return None
+
+        size = 8 * (header["days"] + 1) * (len(header["districts"]) + 1)
+        position = 8 + length
+        if (len(data) != position + size * len(header["sections"])):
+            return None
+        cumulative = {}
+        for section in header["sections"]:
+            counts = array("q", data[position:position + size])
+            if (sys.byteorder == "big"):
+                counts.byteswap()
+            cumulative[section] = counts
+            position += size
+        return cls(header["districts"], to_date(header["first_day"]), header["days"], cumulative, header["signature"],
+                   header.get("undated"))
+
+
+# Function to get the index of a feed cache: loaded from disk if up to date, otherwise rebuilt and saved
+def cached_index(cache):
+    signature = {section: info["length"] for section, info in cache.meta["sections"].items()}
+    path = os.path.join(cache.directory, INDEX_FILE)
+    index = DistrictIndex.load(path)
+    if (index is None or index.signature != signature):
+        index = DistrictIndex.build(cache.records(), signature)
+        index.save(path)
+    return index
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+# Prints new cases by district on the last 7 days of the feed:
+if __name__ == "__main__":
+    cache = FeedCache(DEFAULT_CACHE_DIR)
+    try:
+        cache.update()
+    except Exception:
+        print("Could not update the data, using cached data.\n")
+    index = cached_index(cache)
+
+    if (index.days == 0):
+        print("No data.")
+        exit()
+    last = index.first_day + timedelta(days=index.days - 1)
+    start = last - timedelta(days=6)
+
+    print("\nTartunnat %s - %s: (N=%d, %.1f / vrk)\n------" % (start.strftime("%d.%m."), last.strftime("%d.%m.%Y"),
+          index.total('confirmed', ALL, start, last + timedelta(days=1)), index.rolling_rate('confirmed', ALL, last)))
+    for district, count in index.top('confirmed', 25, start, last + timedelta(days=1)):
+        print("%-18s %6d %8.1f / vrk" % (district if district is not None else "-", count, index.rolling_rate('confirmed', district, last)))
@@ -0,0 +1,520 @@
+# Memory-mapped ESRI Shapefile reader (.shp, .shx, .dbf)
+# Pure Python3, no dependencies
+# Python counterpart of Shapefile_header_reader.c:
+#   - Header (100 bytes) is parsed with struct
+#   - Records are decoded lazily and without copying: coordinates are memoryviews over the mapped file
+#   - .shx offsets are used for random access, record bounding boxes can be read without decoding geometries
+#   - .dbf attributes are decoded field by field on request
+#   - Packed R-tree of record bounding boxes is cached next to the file (.bbi), extent queries only
+#     touch the records whose bounding box intersects the extent
+# See https://www.esri.com/library/whitepapers/pdfs/shapefile.pdf
+
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+
+# Geometry types (as in Shapefile_header_reader.c):
+SHAPE_TYPES = {0:  "Null shape",
+               1:  "Point",
+               3:  "Polyline",
+               5:  "Polygon",
+               8:  "MultiPoint",
+               11: "PointZ",
+               13: "PolylineZ",
+               15: "PolygonZ",
+               18: "MultiPointZ",
+               21: "PointM",
+               23: "PolylineM",
+               25: "PolygonM",
+               28: "MultiPointM",
+               31: "MultiPatch"}
+
+POINT_TYPES = (1, 11, 21)
+MULTIPOINT_TYPES = (8, 18, 28)
+PARTS_TYPES = (3, 5, 13, 15, 23, 25, 31)   # Polyline, Polygon & MultiPatch: parts + points
+Z_TYPES = (11, 13, 15, 18, 31)
+M_TYPES = (21, 23, 25, 28)                  # Z types may have optional M values too
+
+FILE_CODE = 9994
+HEADER_LENGTH = 100
+
+# File code & file length are Big Endian, the rest of the header is Little Endian:
+HEADER_BIG = struct.Struct(">i20xi")
+HEADER_LITTLE = struct.Struct("<2i8d")
+RECORD_HEADER = struct.Struct(">2i")        # Record number, content length (16-bit words)
+BBOX = struct.Struct("<4d")
+POINT_XY = struct.Struct("<2d")
+COUNTS = struct.Struct("<2i")               # Number of parts, number of points
+
+# Spatial index file header: magic, version, node size, .shp size, .shp modification time (ns), number of levels
+INDEX_MAGIC = b"SBBI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4s2iqqi")
+INDEX_NODE_SIZE = 16
+
+LITTLE_ENDIAN_HOST = (sys.byteorder == "little")
+
+
+# Function to parse the 100-byte main file header (.shp and .shx share the same header):
+def read_header(buffer):
+    if (len(buffer) < HEADER_LENGTH):
+        raise ValueError("File is too short to be a shapefile.")
+    filecode, file_len = HEADER_BIG.unpack_from(buffer, 0)
+    if (filecode != FILE_CODE):
+        raise ValueError("Incorrect filecode - File is not a shapefile.")
+    values = HEADER_LITTLE.unpack_from(buffer, 28)
+    return {"filecode":    filecode,
+            "file_length": file_len * 2,     # Length in bytes
+            "version":     values[0],
+            "shape_type":  values[1],
+            "geometry":    SHAPE_TYPES.get(values[1]),
+            "bbox":        values[2:6],      # (min x, min y, max x, max y)
+            "z_range":     values[6:8],
+            "m_range":     values[8:10]}
+
+
+# Function to view little endian doubles of a buffer as a sequence of floats
+#   - Zero-copy memoryview on little endian hosts, byteswapped copy elsewhere
+def double_view(buffer, offset, count):
+    view = memoryview(buffer)[offset:offset + 8 * count]
+    if (LITTLE_ENDIAN_HOST):
+        return view.cast("d")
+    values = array("d", view.tobytes())
+    values.byteswap()
+    return values
+
+
+# Same for little endian 32-bit integers:
+def int_view(buffer, offset, count):
+    view = memoryview(buffer)[offset:offset + 4 * count]
+    if (LITTLE_ENDIAN_HOST):
+        return view.cast("i")
+    values = array("i", view.tobytes())
+    values.byteswap()
+    return values
+
+
+# A lazily decoded shapefile record
+#   - Nothing but the shape type is read before an attribute is accessed
+#   - points: flat coordinate sequence (x0, y0, x1, y1, ...), parts: start vertex index of each part
+class Shape:
+    def __init__(self, buffer, offset, length, index):
+        self.index = index          # Record index (0-based)
+        self._buffer = buffer
+        self._offset = offset       # Byte offset of record content
+        self._length = length       # Content length in bytes
+        self.shape_type = struct.unpack_from("<i", buffer, offset)[0]
+
+    def __repr__(self):
+        return "<Shape %d: %s>" % (self.index, SHAPE_TYPES.get(self.shape_type, self.shape_type))
+
+    @property
+    def geometry(self):
+        return SHAPE_TYPES.get(self.shape_type)
+
+    # Bounding box (min x, min y, max x, max y), None for null shapes
+    @property
+    def bbox(self):
+        return read_bbox(self._buffer, self._offset, self.shape_type)
+
+    # Number of parts & points, and byte offset of the first point:
+    def _layout(self):
+        offset = self._offset
+        if (self.shape_type in POINT_TYPES):
+            return 0, 1, offset + 4
+        if (self.shape_type in MULTIPOINT_TYPES):
+            return 0, struct.unpack_from("<i", self._buffer, offset + 36)[0], offset + 40
+        if (self.shape_type in PARTS_TYPES):
+            num_parts, num_points = COUNTS.unpack_from(self._buffer, offset + 36)
+            points_offset = offset + 44 + 4 * num_parts
+            if (self.shape_type == 31):
+                points_offset += 4 * num_parts  # MultiPatch part types
+            return num_parts, num_points, points_offset
+        return 0, 0, offset + 4     # Null shape
+
+    @property
+    def num_points(self):
+        return self._layout()[1]
+
+    # Part start indices (single part for points & multipoints)
+    @property
+    def parts(self):
+        num_parts, num_points, points_offset = self._layout()
+        if (num_parts == 0):
+            return array("i", [0] if num_points else [])
+        return int_view(self._buffer, self._offset + 44, num_parts)
+
+    # MultiPatch part types (None for other shape types)
+    @property
+    def part_types(self):
+        if (self.shape_type != 31):
+            return None
+        num_parts = self._layout()[0]
+        return int_view(self._buffer, self._offset + 44 + 4 * num_parts, num_parts)
+
+    @property
+    def points(self):
+        num_parts, num_points, points_offset = self._layout()
+        return double_view(self._buffer, points_offset, 2 * num_points)
+
+    # Z values (None if the shape type has no Z)
+    @property
+    def z(self):
+        if (self.shape_type not in Z_TYPES):
+            return None
+        num_parts, num_points, points_offset = self._layout()
+        if (self.shape_type == 11):
+            return double_view(self._buffer, points_offset + 16, 1)
+        return double_view(self._buffer, points_offset + 16 * num_points + 16, num_points)
+
+    # M values (None if the shape type has no M or the optional M block is missing)
+    @property
+    def m(self):
+        if (self.shape_type not in M_TYPES and self.shape_type not in Z_TYPES):
+            return None
+        num_parts, num_points, points_offset = self._layout()
+        end = self._offset + self._length
+        if (self.shape_type in POINT_TYPES):
+            offset = points_offset + (24 if self.shape_type == 11 else 16)
+            return double_view(self._buffer, offset, 1) if offset + 8 <= end else None
+        offset = points_offset + 16 * num_points + (8 * num_points + 16 if self.shape_type in Z_TYPES else 0) + 16
+        return double_view(self._buffer, offset, num_points) if offset + 8 * num_points <= end else None
+
+    # Coordinates of each part as flat (x0, y0, x1, y1, ...) sequences
+    def coordinates(self):
+        points = self.points
+        starts = list(self.parts) + [len(points) // 2]
+        return [points[2 * starts[i]:2 * starts[i + 1]] for i in range(len(starts) - 1)]
+
+    # Vertices of each part as point tuples ((x,y), (x,y), ...) - copies, for point-based algorithms
+    def vertices(self):
+        return [tuple(zip(part[0::2], part[1::2])) for part in self.coordinates()]
+
+
+# Function to read the bounding box of a record without decoding its geometry:
+def read_bbox(buffer, offset, shape_type=None):
+    if (shape_type is None):
+        shape_type = struct.unpack_from("<i", buffer, offset)[0]
+    if (shape_type == 0):
+        return None
+    if (shape_type in POINT_TYPES):
+        x, y = POINT_XY.unpack_from(buffer, offset + 4)
+        return (x, y, x, y)
+    return BBOX.unpack_from(buffer, offset + 4)
+
+
+# dBASE (.dbf) attribute table reader, fields are decoded on request
+class DbfReader:
+    def __init__(self, buffer, encoding="latin-1"):
+        self._buffer = buffer
+        self.encoding = encoding
+        self.num_records, self.header_length, self.record_length = struct.unpack_from("<I2H", buffer, 4)
+        self.fields = {}            # Field name: (type, byte offset within record, length, decimal count)
+        self.field_names = []
+        offset = 1                  # Deletion flag precedes fields
+        position = 32
+        while (buffer[position] != 0x0D):
+            name = bytes(buffer[position:position + 11]).split(b"\x00")[0].decode(encoding)
+            field_type = chr(buffer[position + 11])
+            length, decimals = buffer[position + 16], buffer[position + 17]
+            self.fields[name] = (field_type, offset, length, decimals)
+            self.field_names.append(name)
+            offset += length
+            position += 32
+
+    def __len__(self):
+        return self.num_records
+
+    def is_deleted(self, index):
+        return self._buffer[self.header_length + index * self.record_length] == 0x2A    # '*'
+
+    # Value of a single field of a record:
+    def value(self, index, name):
+        field_type, offset, length, decimals = self.fields[name]
+        start = self.header_length + index * self.record_length + offset
+        raw = bytes(self._buffer[start:start + length])
+        if (field_type in "NF"):
+            raw = raw.strip()
+            if (raw == b"" or raw.startswith(b"*")):
+                return None     # Missing value
+            return int(raw) if (field_type == "N" and decimals == 0 and b"." not in raw) else float(raw)
+        if (field_type == "L"):
+            return True if raw in b"YyTt" else (False if raw in b"NnFf" else None)
+        return raw.decode(self.encoding).rstrip(" \x00")  # Character, Date (YYYYMMDD) & others as text
+
+    # All fields of a record as a dictionary, None for deleted records (like pyshp):
+    def record(self, index):
+        if (self.is_deleted(index)):
+            return None
+        return {name: self.value(index, name) for name in self.field_names}
+
+
+# Packed (Sort-Tile-Recursive) R-tree of record bounding boxes
+#   - Leaves are record bounding boxes sorted into tiles, each upper level node covers node_size nodes below it
+#   - Stored as flat arrays: boxes of all levels (leaves first) and record index of each leaf
+class SpatialIndex:
+    def __init__(self, level_sizes, boxes, records, node_size=INDEX_NODE_SIZE):
+        self.level_sizes = level_sizes  # Number of nodes on each level, leaves first
+        self.boxes = boxes              # array('d'): min x, min y, max x, max y of each node
+        self.records = records          # array('i'): record index of each leaf
+        self.node_size = node_size
+        self.level_offsets = [0]        # First node of each level
+        for size in level_sizes[:-1]:
+            self.level_offsets.append(self.level_offsets[-1] + size)
+
+    def __len__(self):
+        return len(self.records)
+
+    # Build index from (record index, bbox) pairs, null shapes (bbox None) are left out
+    @classmethod
+    def build(cls, bboxes, node_size=INDEX_NODE_SIZE):
+        items = [(i, bbox) for i, bbox in bboxes if bbox is not None]
+
+        # Sort-Tile-Recursive order: vertical slices by center x, each slice sorted by center y
+        items.sort(key=lambda item: item[1][0] + item[1][2])
+        leaf_count = int(math.ceil(len(items) / node_size))
+        slice_size = node_size * max(int(math.ceil(math.sqrt(leaf_count))), 1)
+        ordered = []
+        for start in range(0, len(items), slice_size):
+            ordered.extend(sorted(items[start:start + slice_size], key=lambda item: item[1][1] + item[1][3]))
+
+        records = array("i", [item[0] for item in ordered])
+        boxes = array("d")
+        for item in ordered:
+            boxes.extend(item[1])
+
+        # Upper levels until a single root node:
+        level_sizes = [len(ordered)]
+        level_start = 0
+        while (level_sizes[-1] > 1):
+            count = level_sizes[-1]
+            for start in range(0, count, node_size):
+                first = 4 * (level_start + start)
+                last = 4 * (level_start + min(start + node_size, count))
+                boxes.extend((min(boxes[first:last:4]), min(boxes[first + 1:last:4]),
+                              max(boxes[first + 2:last:4]), max(boxes[first + 3:last:4])))
+            level_start += count
+            level_sizes.append(int(math.ceil(count / node_size)))
+
+        return cls(level_sizes, boxes, records, node_size)
+
+    # Record indices whose bounding box intersects the extent (min x, min y, max x, max y), in file order
+    def query(self, extent):
+        minx, miny, maxx, maxy = extent
+        boxes = self.boxes
+        ret = []
+        if (len(self.records) == 0):
+            return ret
+
+        stack = [(len(self.level_sizes) - 1, 0)]   # (level, node index on level), start from root
+        while (stack):
+            level, node = stack.pop()
+            k = 4 * (self.level_offsets[level] + node)
+            if (boxes[k] > maxx or boxes[k + 2] < minx or boxes[k + 1] > maxy or boxes[k + 3] < miny):
+                continue
+            if (level == 0):
+                ret.append(self.records[node])
+            else:
+                first = node * self.node_size
+                last = min(first + self.node_size, self.level_sizes[level - 1])
+                stack.extend((level - 1, child) for child in range(first, last))
+        ret.sort()
+        return ret
+
+    # Write index to a file, size & modification time of the .shp are stored for validation
+    def save(self, path, shp_stat):
+        boxes = array("d", self.boxes)
+        records = array("i", self.records)
+        sizes = array("i", self.level_sizes)
+        if (not LITTLE_ENDIAN_HOST):
+            for values in (boxes, records, sizes):
+                values.byteswap()   # Index files are little endian
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.node_size, shp_stat.st_size, shp_stat.st_mtime_ns, len(sizes)))
+            f.write(sizes.tobytes())
+            f.write(records.tobytes())
+            f.write(boxes.tobytes())
+
+    # Read index from a file, returns None if the file is missing, invalid or out of date
+    @classmethod
+    def load(cls, path, shp_stat):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, node_size, size, mtime, levels = INDEX_HEADER.unpack_from(data, 0)
+            if (magic != INDEX_MAGIC or version != INDEX_VERSION or size != shp_stat.st_size or mtime != shp_stat.st_mtime_ns):
+                return None
+            position = INDEX_HEADER.size
+            sizes = array("i", data[position:position + 4 * levels])
+            position += 4 * levels
+            records = array("i", data[position:position + 4 * sizes[0]])
+            position += 4 * sizes[0]
+            boxes = array("d", data[position:])
+        except Exception:
+            return None
+
+        if (not LITTLE_ENDIAN_HOST):
+            for values in (boxes, records, sizes):
+                values.byteswap()
+        if (len(boxes) != 4 * sum(sizes)):
+            return None
+        return cls(list(sizes), boxes, records, node_size)
+
+
+# Memory-mapped shapefile reader
+# Usage:
+#   with ShapefileReader("fairways.shp") as shp:
+#       print(shp.header["geometry"], len(shp))
+#       for shape in shp:
+#           shape.bbox, shape.coordinates(), shp.value(shape.index, "SDEPFWYARE")
+#       for shape in shp.query((minx, miny, maxx, maxy)):    # Only records with intersecting bounding box
+#           ...
+class ShapefileReader:
+    def __init__(self, path, encoding=None):
+        base = os.path.splitext(path)[0]
+        self.path = base + ".shp"
+        self._files = []
+        self._maps = []
+        self._shp = self._map(self.path)
+        self.header = read_header(self._shp)
+        self._index = None
+
+        # Record offsets: index file if it exists, otherwise scan record headers once
+        self._shx = self._map(base + ".shx") if os.path.exists(base + ".shx") else None
+        if (self._shx is not None):
+            self._count = (len(self._shx) - HEADER_LENGTH) // 8
+            self._offsets = None
+        else:
+            self._offsets = self._scan_offsets()
+            self._count = len(self._offsets)
+
+        # Attributes, .cpg tells the encoding:
+        self.dbf = None
+        if (os.path.exists(base + ".dbf")):
+            if (encoding is None and os.path.exists(base + ".cpg")):
+                with open(base + ".cpg") as f:
+                    encoding = f.read().strip() or None
+            self.dbf = DbfReader(self._map(base + ".dbf"), encoding or "latin-1")
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _scan_offsets(self):
+        offsets = array("q")
+        position = HEADER_LENGTH
+        end = min(self.header["file_length"], len(self._shp))
+        while (position + 8 <= end):
+            offsets.append(position)
+            position += 8 + 2 * RECORD_HEADER.unpack_from(self._shp, position)[1]
+        return offsets
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Closes files. Views of closed maps must not be used anymore.
+    def close(self):
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                pass    # Views still exported, map is released when they are
+        for f in self._files:
+            f.close()
+        self._maps = []
+        self._files = []
+
+    # Byte offset of record content and content length in bytes
+    def record_offset(self, index):
+        if (index < 0):
+            index += self._count
+        if (index < 0 or index >= self._count):
+            raise IndexError("Record index out of range.")
+        if (self._shx is not None):
+            offset, length = RECORD_HEADER.unpack_from(self._shx, HEADER_LENGTH + 8 * index)
+            return 2 * offset + 8, 2 * length
+        offset = self._offsets[index]
+        return offset + 8, 2 * RECORD_HEADER.unpack_from(self._shp, offset)[1]
+
+    # Bounding box of a record, geometry isn't decoded
+    def bbox(self, index):
+        return read_bbox(self._shp, self.record_offset(index)[0])
+
+    # Iterator over (index, bbox) pairs
+    def bboxes(self):
+        for i in range(self._count):
+            yield i, self.bbox(i)
+
+    def shape(self, index):
+        offset, length = self.record_offset(index)
+        return Shape(self._shp, offset, length, index % self._count)
+
+    def __getitem__(self, index):
+        return self.shape(index)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self.shape(i)
+
+    # Spatial index of record bounding boxes
+    #   - Loaded from <name>.bbi next to the shapefile, (re)built and cached if missing or out of date
+    #   - Cache write errors (read-only directories) are ignored, the index is kept in memory only
+    def spatial_index(self):
+        if (self._index is None):
+            index_path = os.path.splitext(self.path)[0] + ".bbi"
+            shp_stat = os.stat(self.path)
+            self._index = SpatialIndex.load(index_path, shp_stat)
+            if (self._index is None):
+                self._index = SpatialIndex.build(self.bboxes())
+                try:
+                    self._index.save(index_path, shp_stat)
+                except OSError:
+                    pass
+        return self._index
+
+    # Shapes whose bounding box intersects the extent (min x, min y, max x, max y)
+    #   - Only the matching records are read, geometries are decoded lazily as usual
+    def query(self, extent):
+        for i in self.spatial_index().query(extent):
+            yield self.shape(i)
+
+    # Attribute value of a record (None if there's no .dbf)
+    def value(self, index, name):
+        return self.dbf.value(index, name) if self.dbf is not None else None
+
+    # All attributes of a record as a dictionary (None if the record is deleted in the .dbf)
+    def record(self, index):
+        return self.dbf.record(index) if self.dbf is not None else {}
+
+
+# Prints header information like Shapefile_header_reader.c:
+if __name__ == "__main__":
+    if (len(sys.argv) < 2 or not sys.argv[1].lower().endswith(".shp")):
+        print("Usage: python3 Shapefile_reader.py path/to/file.shp")
+        sys.exit(1)
+
+    with ShapefileReader(sys.argv[1]) as shp:
+        h = shp.header
+        print("Filecode: \t%d - Shapefile filetype verified." % h["filecode"])
+        print("File length: \t%d bytes" % h["file_length"])
+        print("Version: \t%d" % h["version"])
+        print("Geometry: \t%s" % h["geometry"])
+        print("Bounding box: \t(%f, %f) - (%f, %f)" % tuple(h["bbox"]))
+        print("Z range: \t%f - %f" % tuple(h["z_range"]))
+        print("M range: \t%f - %f" % tuple(h["m_range"]))
+        print("Records: \t%d" % len(shp))
+        if (shp.dbf is not None):
+            print("Fields: \t%s" % ", ".join(shp.dbf.field_names))
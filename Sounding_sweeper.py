@@ -10,6 +10,12 @@ from shapely.geometry import Point
 import geopandas as gpd
 import Tkinter as Tk  # File IO-dialog
 from tkFileDialog import askopenfilename  # File IO-dialog
+import argparse
+import logging
+import os
+from Fairway_tiles import get_tile_index, polygon_rings
+from Sweep_core import iterate_points
+from Sweep_monitor import TIMING_SAMPLE, ProgressMeter, SweepStats, buffered_logger
 
 
 # Function for fairway areas shapefile input:
@@ -81,6 +87,20 @@ def reproject_data(data, point_epsg):
     except Exception:
         print "Error: Reprojection failed."
         exit()
+    return data
+
+
+# Function to get depth-tiled fairway index (cached next to the fairway shapefile):
+def read_fairway_tiles(fairway, fairway_path, point_epsg):
+    try:
+        print "\nPreparing fairway tiles.."
+        areas = [(fairway.loc[i]["SDEPFWYARE"], polygon_rings(fairway.loc[i]["geometry"])) for i in range(len(fairway))]
+        tiles = get_tile_index(areas, fairway_path, point_epsg)
+        print "Fairway tiles OK."
+    except Exception:
+        print "Error: Preparing fairway tiles failed."
+        exit()
+    return tiles
 
 
 # Function to erase new files that include errors:
@@ -98,58 +118,42 @@ def check_correction(loop, corrected, tracklist, points):
         exit()
 
 
-# Point iterator function:
-def iterate_points(points, fairwayareas, deepest_sweep, corrected_out, tracklist_out):
-    try:
-        print "\nIterating over points file.. (please be patient as this might take a while)"
-        for p in points:
-            point_coordinates = p.split(" ")
-            if (abs(float(point_coordinates[2])) >= deepest_sweep):
-                corrected_out.write(p)  # Point depth >= deepest sweep, can be written right away to make processing faster
-            else:
-                writerFunction(fairwayareas, p, point_coordinates, corrected_out, tracklist_out)  # Point directed to further processing
-        return True
-
-    except Exception:
-        return False
-
-
-# Function to check, correct and write points:
-def writerFunction(fairway, p, point_coordinates, corrected_out, tracklist_out):
-    try:
-        var_point = Point(float(point_coordinates[0]), float(point_coordinates[1]))
-        var_depth = abs(float(point_coordinates[2]))
-
-        for i in range(len(fairway)):   # Loop trough fairway areas
-            sweep_depth = fairway.loc[i]["SDEPFWYARE"]
-            sweep_geometry = fairway.loc[i]["geometry"]
+# Function to check the point against fairway areas (exact geometry test):
+#   - Returns swept depth of the (first) fairway the point is on if point is shallower than it, otherwise None
+def conflicting_sweep_depth(fairway, point_coordinates, var_depth):
+    var_point = Point(float(point_coordinates[0]), float(point_coordinates[1]))
 
-            if (sweep_geometry.intersects(var_point)):  # Point on fairway area?
-                if (var_depth < sweep_depth):   # Depth shallower than swept depth?
+    for i in range(len(fairway)):   # Loop trough fairway areas
+        sweep_depth = fairway.loc[i]["SDEPFWYARE"]
+        sweep_geometry = fairway.loc[i]["geometry"]
 
-                    tracklist_out.write(p)  # Original points are stored on a tracking list
-                    point_coordinates[2] = str(0.0 - sweep_depth)  # Set point depth to swept depth
-                    row = point_coordinates[0] + " " + point_coordinates[1] + " " + point_coordinates[2] + "\n"  # Define row (single point in XYZ)
-                    corrected_out.write(row)    # Write corrected point
-                    print("Conflicting point detected: Point Z = " + str(var_depth) + ", swept depth = " + str(sweep_depth))
-                    return  # Point written, return
+        if (sweep_geometry.intersects(var_point)):  # Point on fairway area?
+            if (var_depth < sweep_depth):   # Depth shallower than swept depth?
+                return sweep_depth
+            return None     # Point OK
 
-                else:
-                    corrected_out.write(p)  # Point OK --> write
-                    return  # Point written, return
+    return None     # Point not on fairways --> OK
 
-        corrected_out.write(p)  # Point not on fairways --> OK --> write
-        return  # Point written, return
 
-    except Exception:  # Error protection
-        print "Error: error writing points to a file. Exiting."
-        exit()
+# Function for command line options (file dialogs and EPSG input are used for the rest):
+def parse_options():
+    parser = argparse.ArgumentParser(description="Removes too shallow soundings from the point data.")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON run report to PATH")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="log level, conflicting points are logged on WARNING level, DEBUG also times every point (default: WARNING)")
+    parser.add_argument("--log-file", metavar="PATH", help="write log to PATH instead of the screen")
+    parser.add_argument("--progress-interval", type=float, default=2.0, metavar="SECONDS",
+                        help="minimum interval between progress updates (default: 2.0)")
+    return parser.parse_args()
 
 
 # # # # # # # #
 # Main method #
 # # # # # # # #
 
+options = parse_options()
+log = buffered_logger("Sounding_sweeper", options.log_level, options.log_file)   # Buffered, conflicts don't slow down the run
+
 # Get points file, parse output filepaths:
 points_fp = input_points()  # Get original points filepath
 corrected_fp, tracklist_fp = parse_outputfilepaths(points_fp)  # Parse output filepaths
@@ -160,7 +164,10 @@ fairway_fp = input_fairwayareas_path()  # Get path
 fairways, deepest_sweep, fairway_epsg = read_fairways(fairway_fp)  # Get file pointer, deepest swepth depth and EPSG code
 
 # Reproject fairway areas to match points CRS:
-reproject_data(fairways, point_crs)
+fairways = reproject_data(fairways, point_crs)
+
+# Rasterize fairway areas for early acceptance/rejection of points (cached by shapefile hash and EPSG):
+fairway_tiles = read_fairway_tiles(fairways, fairway_fp, point_crs)
 
 
 # Open files (also takes care of closing the files in all cases):
@@ -169,10 +176,23 @@ with open(points_fp, "r") as points, \
         open(tracklist_fp, "a") as tracklist_out:
 
     # Correct the points, write output files and check if everything went ok:
-    correction_successful = iterate_points(points, fairways, deepest_sweep, corrected_out, tracklist_out)
+    stats = SweepStats(1 if options.log_level == "DEBUG" else TIMING_SAMPLE)   # Time every point when debugging
+    progress = ProgressMeter(os.path.getsize(points_fp), options.progress_interval)
+    exact_test = lambda point_coordinates, var_depth: conflicting_sweep_depth(fairways, point_coordinates, var_depth)
+    print "\nIterating over points file.."
+    correction_successful = iterate_points(points, exact_test, deepest_sweep, fairway_tiles, corrected_out, tracklist_out, stats, progress, log)
+    stats.stop()
+    logging.shutdown()  # Flush buffered log
     check_correction(correction_successful, corrected_out, tracklist_out, points)  # If errors were found, output files will be empty
 
     # In case of success:
     print "\nSweeping successful! Check new files: "
     print corrected_fp
     print tracklist_fp, "\n"
+    print stats.summary(), "\n"
+    if (options.log_file and stats.counters["conflicts"] > 0):
+        print "Conflicting points logged to:", options.log_file, "\n"
+
+    if (options.report):
+        stats.dump_report(options.report, points=points_fp, fairways=fairway_fp, epsg=point_crs, deepest_sweep=float(deepest_sweep))
+        print "Run report written to:", options.report, "\n"
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Point sweep loop of Sounding_sweeper.py
+#   - Reads XYZ rows, accepts or clamps points with the fairway tile index (Fairway_tiles.py) and directs
+#     points on fairway boundary cells to the exact geometry test given by the caller
+#   - Kept free of GIS dependencies so it can be imported on its own (e.g. by Benchmark.py)
+# Works on Python 2 & 3, no dependencies
+
+from Fairway_tiles import OUTSIDE, INSIDE
+from Sweep_monitor import clock
+
+
+# Point iterator function:
+#   - exact_test(point_coordinates, var_depth): exact geometry test for points on fairway boundary cells,
+#     returns swept depth of the (first) fairway the point is on if point is shallower than it, otherwise None
+#   - Stage timers (parse, prefilter, polygon test, write) are read on every stats.sample_every:th point only,
+#     the clock isn't read for the other points. Counters are exact.
+#   - Conflicting points are logged on WARNING level to a buffered log (reported with the default log level like
+#     the prints they replaced), progress is shown at most once per progress interval
+# Returns True on success, False if processing failed (error is logged)
+def iterate_points(points, exact_test, deepest_sweep, tiles, corrected_out, tracklist_out, stats, progress, log):
+    timers = stats.timers
+    counters = stats.counters
+    sample_every = stats.sample_every
+    countdown = 1
+    try:
+        for p in points:
+            countdown -= 1
+            timed = (countdown == 0)    # Point timed?
+            if (timed):
+                countdown = sample_every
+                stats.timed_points += 1
+                t0 = clock()
+            point_coordinates = p.split(" ")
+            var_depth = abs(float(point_coordinates[2]))
+            counters["points"] += 1
+            if (timed):
+                t1 = clock()
+                timers["parse"] += t1 - t0
+
+            sweep_depth = None  # Swept depth at point if point is in conflict with it
+            if (var_depth >= deepest_sweep):
+                counters["fast_accepts"] += 1   # Point depth >= deepest sweep, can be written right away to make processing faster
+            else:
+                flag, cell_depth = tiles.lookup(float(point_coordinates[0]), float(point_coordinates[1]))
+                if (flag == OUTSIDE or var_depth >= cell_depth):
+                    counters["tile_accepts"] += 1   # Point not on fairways or deeper than any sweep on its cell --> OK
+                elif (flag == INSIDE):
+                    counters["tile_clamps"] += 1    # Cell inside a single fairway, no geometry test needed
+                    sweep_depth = cell_depth
+                else:
+                    counters["polygon_tests"] += 1  # Point on a boundary cell directed to further processing
+                    if (timed):
+                        t2 = clock()
+                        timers["prefilter"] += t2 - t1
+                        t1 = t2
+                    sweep_depth = exact_test(point_coordinates, var_depth)
+                    if (timed):
+                        t2 = clock()
+                        timers["polygon_test"] += t2 - t1
+                        t1 = t2
+            if (timed):
+                t2 = clock()
+                timers["prefilter"] += t2 - t1
+
+            if (sweep_depth is None):
+                corrected_out.write(p)  # Point OK --> write
+            else:
+                counters["conflicts"] += 1
+                write_conflict(p, point_coordinates, sweep_depth, corrected_out, tracklist_out)
+                log.warning("Conflicting point detected: Point Z = %s, swept depth = %s", var_depth, sweep_depth)
+            if (timed):
+                timers["write"] += clock() - t2
+            progress.update(len(p))
+
+        progress.finish()
+        return True
+
+    except Exception:
+        log.exception("Error processing points.")
+        return False
+
+
+# Function to write a conflicting point: original to tracking list, corrected (swept depth) to output:
+def write_conflict(p, point_coordinates, sweep_depth, corrected_out, tracklist_out):
+    tracklist_out.write(p)  # Original points are stored on a tracking list
+    point_coordinates[2] = str(0.0 - sweep_depth)  # Set point depth to swept depth
+    row = point_coordinates[0] + " " + point_coordinates[1] + " " + point_coordinates[2] + "\n"  # Define row (single point in XYZ)
+    corrected_out.write(row)    # Write corrected point
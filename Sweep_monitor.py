@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Run instrumentation for Sounding_sweeper.py
+#   - Rate-limited progress meter (points/s, ETA based on bytes read)
+#   - Per-stage timers and counters, JSON run report
+#   - Buffered logger for per-point messages (conflicts)
+# Works on Python 2 & 3, no dependencies
+
+from __future__ import division
+import json
+import logging
+import logging.handlers
+import sys
+import time
+from timeit import default_timer as clock   # Highest resolution wall clock on both Python 2 & 3
+
+
+# Sweep stages timed separately:
+STAGES = ("parse", "prefilter", "polygon_test", "write")
+
+# Sweep counters:
+COUNTERS = ("points", "conflicts", "fast_accepts", "tile_accepts", "tile_clamps", "polygon_tests")
+
+TIMING_SAMPLE = 64  # Stage timers are read on every TIMING_SAMPLE:th point only
+
+
+# Progress meter
+#   - Prints at most once per interval (seconds), clock is only read every check_every points
+#   - ETA is based on bytes read vs. file size, as the number of points isn't known beforehand
+class ProgressMeter(object):
+    def __init__(self, total_bytes, interval=2.0, stream=None, check_every=4096):
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stdout
+        self.check_every = check_every
+        self.bytes_read = 0
+        self.points = 0
+        self.started = clock()
+        self.last_print = self.started
+        self._countdown = check_every
+
+    # Register a processed point (nbytes = length of its row in the file)
+    def update(self, nbytes):
+        self.bytes_read += nbytes
+        self.points += 1
+        self._countdown -= 1
+        if (self._countdown <= 0):
+            self._countdown = self.check_every
+            now = clock()
+            if (now - self.last_print >= self.interval):
+                self.last_print = now
+                self.show(now)
+
+    # Print progress line (overwrites the previous one)
+    def show(self, now=None):
+        now = clock() if now is None else now
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.points / elapsed
+        done = self.bytes_read / self.total_bytes if self.total_bytes else 0.0
+        eta = elapsed * (1 - done) / done if done > 0 else float("inf")
+        self.stream.write("\r%5.1f %%  %12d points  %10.0f points/s  ETA %s   " % (100 * min(done, 1.0), self.points, rate, format_duration(eta)))
+        self.stream.flush()
+
+    # Print final progress line
+    def finish(self):
+        self.show()
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+# Stage timers and counters of a sweep run
+#   - Counters are exact. Stage timers are only read on every sample_every:th point (timed_points),
+#     stage times are estimated from them. sample_every=1 times every point.
+class SweepStats(object):
+    def __init__(self, sample_every=TIMING_SAMPLE):
+        self.timers = dict((stage, 0.0) for stage in STAGES)
+        self.counters = dict((counter, 0) for counter in COUNTERS)
+        self.sample_every = sample_every
+        self.timed_points = 0
+        self.started = time.time()
+        self.finished = None
+
+    def stop(self):
+        self.finished = time.time()
+
+    # Estimated stage times of all points (seconds)
+    def stage_times(self):
+        scale = self.counters["points"] / self.timed_points if self.timed_points else 0.0
+        return dict((stage, self.timers[stage] * scale) for stage in STAGES)
+
+    # Run report as a dictionary
+    def report(self, **extra):
+        wall = (self.finished if self.finished is not None else time.time()) - self.started
+        report = {"started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                  "wall_time_s": wall,
+                  "points_per_s": self.counters["points"] / wall if wall > 0 else None,
+                  "stage_time_s": self.stage_times(),
+                  "timing_sample_every": self.sample_every,
+                  "counters": dict(self.counters)}
+        report.update(extra)
+        return report
+
+    # Write run report to a JSON file
+    def dump_report(self, path, **extra):
+        with open(path, "w") as f:
+            json.dump(self.report(**extra), f, indent=2, sort_keys=True)
+
+    # Short summary lines for the screen
+    def summary(self):
+        lines = ["%-14s %12d" % (name, self.counters[name]) for name in COUNTERS]
+        times = self.stage_times()
+        lines += ["%-14s %12.3f s" % (name, times[name]) for name in STAGES]
+        return "\n".join(lines)
+
+
+# Function to format seconds as H:MM:SS:
+def format_duration(seconds):
+    if (seconds != seconds or seconds == float("inf")):
+        return "--:--:--"
+    seconds = int(round(seconds))
+    return "%d:%02d:%02d" % (seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+
+
+# Function to set up a buffered logger
+# Inputs:
+#   - Logger name, level (name or number), optional log filepath (default: stderr)
+#   - Buffer capacity: records are written in batches, errors flush the buffer immediately
+# Returns:
+#   - Logger. Call logging.shutdown() (or the returned logger's handlers' flush) at the end of the run
+def buffered_logger(name, level="WARNING", path=None, capacity=1024):
+    logger = logging.getLogger(name)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    target = logging.FileHandler(path, mode="a") if path else logging.StreamHandler(sys.stderr)
+    target.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(logging.handlers.MemoryHandler(capacity, flushLevel=logging.ERROR, target=target))
+    return logger
@@ -1,95 +1,163 @@
 # Python3
 # Prints latest weather observations of fmi Kumpula (Helsinki) (closest to me :) or Kaisaniemi weather station each time
-# terminal is launched. 
+# terminal is launched. Stations are fetched concurrently, the station list can be extended.
 # You need to edit .bash_profile (on mac os) to execute the script on terminal launch
+# Latest observations are cached for a while (CACHE_TTL): launches within the cache window skip the network
+# and XML parsing entirely. Network, XML and time zone modules are only imported on a cache miss.
+# Set WEATHER_TIMING=1 to print the run time of the script.
 
 
-# Imports
-import urllib.request
-import xml.etree.ElementTree as ET
+# Imports (heavier ones are imported where needed)
+import json
+import os
+import sys
+import time
 from datetime import datetime, timedelta
-import pytz
-import fnmatch
+
+_started = time.perf_counter()
+
+CACHE_TTL = 600     # Seconds, FMI updates observations every 10 minutes
+CACHE_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'weather_observations.json')
 
 
 # Get urls to fetch the data from
-def get_connection_urls():
+#   - Input: list of stations [(station name, FMI place), ...]
+#   - Output: {station name: url, ...} in the same order
+def get_connection_urls(stations):
     time = datetime.utcnow() + timedelta(hours = -1.17)     # Last hour
     time_iso = time.isoformat()                             # To ISO format
     time_obs = time_iso[:-7] + 'Z'                          # Timestamp must be like '2016-09-21T17:30:45Z'
 
-    kumpula_observation    = 'https://opendata.fmi.fi/wfs?request=getFeature&storedquery_id=fmi::observations::weather::timevaluepair&place=kumpula,helsinki&maxlocations=1&starttime='     + time_obs
-    kaisaniemi_observation = 'https://opendata.fmi.fi/wfs?request=getFeature&storedquery_id=fmi::observations::weather::timevaluepair&place=kaisaniemi,helsinki&maxlocations=1&starttime='  + time_obs
-
-    return {'Kumpula': kumpula_observation, 'Kaisaniemi': kaisaniemi_observation}
-
-
-# Try to get the data, if response is slow -> exit and continue with logon
-def fetch_data(urls):
-    try:
-        kumpula = urllib.request.urlopen(urls['Kumpula'], timeout = 1.5)
-        kaisaniemi = urllib.request.urlopen(urls['Kaisaniemi'], timeout = 1.5)
-    except Exception:
-        print('Weather observation timeout, continuing.')
-        exit()
+    url = 'https://opendata.fmi.fi/wfs?request=getFeature&storedquery_id=fmi::observations::weather::timevaluepair&place=%s&maxlocations=1&starttime=%s'
+    return {name: url % (place, time_obs) for name, place in stations}
+
+
+# Get data of a single station:
+def fetch_station(http, url):
+    response = http.request('GET', url)
+    if (response.status != 200):
+        raise IOError('HTTP status %d' % response.status)
+    return response.data
+
+
+# Decide primary observation location based on response length and number of NA's:
+#   The reason behind this is that the Kumpula station seems to be non-functional every now and then
+#   and only returns a few rows of data. Kaisaniemi seems to operate more reliably and constantly.
+#   Stations are compared in order of preference: a later station is chosen only if the preferred
+#   one has a shorter response or more NA's. I still slightly prefer Kumpula due to its location.
+def choose_station(responses, preference):
+    best = None
+    for station in preference:
+        if (station not in responses):
+            continue
+        obs = responses[station]
+        if (best is None or not (len(responses[best]) >= len(obs) and responses[best].count(b'NaN') <= obs.count(b'NaN'))):
+            best = station
+    return best
+
+
+# Try to get the data of all stations concurrently, if response is slow -> exit and continue with logon
+#   - Station choice is made as soon as all responses have arrived, or with the responses that have
+#     arrived when the deadline (seconds) hits
+#   - All requests share one connection pool
+def fetch_data(urls, deadline = 1.5):
+    from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+    import urllib3
+
+    http = urllib3.PoolManager(maxsize = len(urls), timeout = urllib3.Timeout(total = deadline), retries = False)
+    executor = ThreadPoolExecutor(max_workers = len(urls))
+    futures = {executor.submit(fetch_station, http, url): station for station, url in urls.items()}
+    responses = {}
 
     try:
-        obs_kumpula = kumpula.read()
-        obs_kaisaniemi = kaisaniemi.read()
-    except Exception:
-        print('Reading weather observation data failed, continuing.')
+        for future in as_completed(futures, timeout = deadline):
+            try:
+                responses[futures[future]] = future.result()
+            except Exception:
+                pass        # Failed station, others may still be fine
+    except FuturesTimeout:
+        pass                # Deadline hit, continue with responses received so far
     finally:
-        kumpula.close()     # Close server connections
-        kaisaniemi.close()
-
-    # Decide primary observation location based on response length and number of NA's:
-    #   The reason behind this is that the Kumpula station seems to be non-functional every now and then
-    #   and only returns a few rows of data. Kaisaniemi seems to operate more reliably and constantly.
-    #   I still slightly prefer Kumpula due to its location:
-
-    na_kumpula = len(fnmatch.filter(str(obs_kumpula), '*NaN*'))
-    na_kaisaniemi = len(fnmatch.filter(str(obs_kaisaniemi), '*NaN*'))
+        executor.shutdown(wait = False)
 
-    if(len(obs_kumpula) >= len(obs_kaisaniemi) and na_kumpula <= na_kaisaniemi):
-        obs = obs_kumpula
-        station = 'Kumpula'
-    else:
-        obs = obs_kaisaniemi
-        station = 'Kaisaniemi'
+    if (len(responses) == 0):
+        print('Weather observation timeout, continuing.')
+        exit()
 
-    return (station, obs)   # Return selected station and its raw gml data
+    station = choose_station(responses, list(urls))
+    return (station, responses[station])   # Return selected station and its raw gml data
 
 
 # Parse GML data to a dictionary:
+#   - Streaming parser: only the newest non-NaN time-value pair of each MeasurementTimeseries is kept,
+#     parsed elements are cleared as we go and only the kept timestamps are converted
 def parse_data(data):
-    root = ET.fromstring(data)              # XML/GML parser root
-    ret  = {}                               # Empty dictionary for observation variables
-    tz = pytz.timezone('Europe/Helsinki')   # Parse results in Finnish time
-
-    # Get observations:
-    variables = root.findall('.//wml2:MeasurementTimeseries', namespaces)
-    for i in range(len(variables)):
-        observations = variables[i].findall('.//wml2:MeasurementTVP', namespaces)   # Find all time-value pairs
-        varname = str(list(variables[i].attrib.values())[0].split('-')[-1])         # Get variable name
-        for i in observations:
-            if (i[1].text != 'NaN'):                                                # Don't save missing data
-                time = datetime.strptime(i[0].text, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo = pytz.UTC)
-                time=time.astimezone(tz)
-                value = float(i[1].text)
-                ret[varname] = [time, value]                                        # Save observation time and value
+    import xml.etree.ElementTree as ET
+    from io import BytesIO
+    import pytz
+
+    timeseries_tag = '{%s}MeasurementTimeseries' % namespaces['wml2']
+    tvp_tag        = '{%s}MeasurementTVP' % namespaces['wml2']
+    time_tag       = '{%s}time' % namespaces['wml2']
+    value_tag      = '{%s}value' % namespaces['wml2']
+    member_tag     = '{%s}member' % namespaces['wfs']
+
+    newest  = {}                            # Variable name: (time text, value text)
+    varname = None
+    for event, element in ET.iterparse(BytesIO(data), events = ('start', 'end')):
+        if (event == 'start'):
+            if (element.tag == timeseries_tag):
+                varname = str(list(element.attrib.values())[0].split('-')[-1])     # Get variable name
+        elif (element.tag == tvp_tag):
+            stamp = element.findtext(time_tag)
+            value = element.findtext(value_tag)
+            if (value != 'NaN' and (varname not in newest or stamp >= newest[varname][0])):  # Don't save missing data
+                newest[varname] = (stamp, value)                                    # ISO timestamps compare as text
+            element.clear()
+        elif (element.tag == timeseries_tag or element.tag == member_tag):
+            element.clear()
+
+    # Convert kept observations (Finnish time):
+    ret = {}                                # Dictionary for observation variables
+    tz = pytz.timezone('Europe/Helsinki')
+    for varname, (stamp, value) in newest.items():
+        stamp = datetime.strptime(stamp, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo = pytz.UTC).astimezone(tz)
+        ret[varname] = [stamp, float(value)]                                        # Save observation time and value
 
     #printvars(ret)                                                                 # Debugging call
 
-    # Get latest timestamp of observations:
-    timestamps = []
-    temp = list(ret.values())   # All observation time-value pairs
+    latest_observation = max(obs[0] for obs in ret.values())    # Latest observation time
+    return (ret, latest_observation)        # Return data dictionary and latest timestamp
 
-    # Put all timestamps in a list (use local time zone)
-    for i in range(len(temp)):
-        timestamps.append(temp[i][0])
-    latest_observation = max(timestamps)    # Find maximum value (= latest observation time)
 
-    return (ret, latest_observation)        # Return data dictionary and latest timestamp
+# Read cached observations
+#   - Returns (station, data dictionary, latest timestamp) or None if the cache is missing, expired
+#     or made with another station list
+def load_cache(stations, path = CACHE_PATH, ttl = CACHE_TTL):
+    try:
+        with open(path, encoding = 'utf-8') as f:
+            cache = json.load(f)
+        if (time.time() - cache['saved'] > ttl or cache['stations'] != [name for name, place in stations]):
+            return None
+        vlist = {name: [datetime.fromisoformat(stamp), value] for name, (stamp, value) in cache['observations'].items()}
+        return (cache['station'], vlist, max(obs[0] for obs in vlist.values()))
+    except Exception:
+        return None
+
+
+# Write observations to cache (errors are ignored, cache is an optimization only):
+def save_cache(station, vlist, stations, path = CACHE_PATH):
+    cache = {'saved':        time.time(),
+             'stations':     [name for name, place in stations],
+             'station':      station,
+             'observations': {name: [stamp.isoformat(), value] for name, (stamp, value) in vlist.items()}}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        with open(path + '.tmp', 'w', encoding = 'utf-8') as f:
+            json.dump(cache, f)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
 
 
 # Function to get older observations timestamps in a preferred form:
@@ -151,6 +219,10 @@ def print_observations(vlist, latest, station):
 #       Main:       #
 # # # # # # # # # # #
 
+# Observation stations in order of preference: (station name, FMI place)
+stations = [('Kumpula',    'kumpula,helsinki'),
+            ('Kaisaniemi', 'kaisaniemi,helsinki')]
+
 # Define XML/GML namespaces:
 namespaces = {'wfs'     : 'http://www.opengis.net/wfs/2.0',
               'xsi'     : 'http://www.w3.org/2001/XMLSchema-instance',
@@ -226,7 +298,16 @@ weather = {0:  'Ei merkittäviä sääilmiöitä',
            87: 'Kovia lumikuuroja',
            89: 'Raekuuroja mahdollisesti yhdessä vesi- tai räntäsateen kanssa'}
 
-urls          = get_connection_urls()
-station, data = fetch_data(urls)
-vlist, latest = parse_data(data)
-print_observations(vlist, latest, station)
+if __name__ == '__main__':
+    cached = load_cache(stations)
+    if (cached is not None):
+        station, vlist, latest = cached
+    else:
+        urls          = get_connection_urls(stations)
+        station, data = fetch_data(urls)
+        vlist, latest = parse_data(data)
+        save_cache(station, vlist, stations)
+    print_observations(vlist, latest, station)
+
+    if (os.environ.get('WEATHER_TIMING')):
+        print('Weather: %.1f ms (%s)' % (1000 * (time.perf_counter() - _started), 'cached' if cached is not None else 'fetched'), file = sys.stderr)
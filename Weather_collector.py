@@ -0,0 +1,339 @@
+# Python3
+# Collects weather observations of many FMI stations, e.g. every 10 minutes:
+#   - Stations (fmisid) are batched into as few WFS queries as possible (several fmisid parameters per query)
+#   - All queries share one pooled keep-alive connection
+#   - Observations are appended to fixed-size ring buffers (one per station & variable), so the latest
+#     values and rolling window statistics are answered from memory without parsing XML again
+#   - Base url is configurable: responses can be recorded (--record) and replayed by a local stand-in
+#     server (--replay) for testing
+# GML is parsed with the namespaces of Weather.py
+
+
+import argparse
+import calendar
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from io import BytesIO
+from urllib.parse import urlencode
+import xml.etree.ElementTree as ET
+
+import urllib3
+
+from Weather import namespaces
+
+
+FMI_URL          = 'https://opendata.fmi.fi/wfs'
+STORED_QUERY     = 'fmi::observations::weather::timevaluepair'
+BATCH_SIZE       = 20           # Stations per query
+POLL_INTERVAL    = 600          # Seconds, FMI updates observations every 10 minutes
+HISTORY          = 3600         # Seconds of history to fetch on the first poll
+OVERLAP          = 1200         # Seconds, later polls re-request this much to catch late observations
+DEFAULT_CAPACITY = 1008         # Observations per station & variable (7 days of 10 minute data)
+TIME_FORMAT      = '%Y-%m-%dT%H:%M:%SZ'
+
+
+# Fixed-size time series of (epoch seconds, value) pairs
+#   - Two preallocated arrays of doubles, the oldest values are overwritten when full
+#   - Times must increase: older or duplicate times are ignored, except a missing value (NaN)
+#     at the latest time may be replaced with a real one
+class RingBuffer:
+    def __init__(self, capacity = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times    = array('d', [math.nan]) * capacity
+        self.values   = array('d', [math.nan]) * capacity
+        self.count    = 0           # Number of values ever appended
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    # Physical position of the k:th stored value (0 = oldest)
+    def _position(self, k):
+        return (self.count - len(self) + k) % self.capacity
+
+    # Append a value, returns True if it was stored
+    def append(self, t, value):
+        if (self.count > 0):
+            last = (self.count - 1) % self.capacity
+            if (t < self.times[last]):
+                return False
+            if (t == self.times[last]):
+                if (math.isnan(self.values[last]) and not math.isnan(value)):
+                    self.values[last] = value
+                    return True
+                return False
+        position = self.count % self.capacity
+        self.times[position]  = t
+        self.values[position] = value
+        self.count += 1
+        return True
+
+    # Latest non-missing (time, value), None if there are none
+    def latest(self):
+        for k in range(len(self) - 1, -1, -1):
+            position = self._position(k)
+            if (not math.isnan(self.values[position])):
+                return (self.times[position], self.values[position])
+        return None
+
+    # Stored (time, value) pairs on [start, end), missing values excluded
+    #   - Times are sorted, the window start is found with a binary search
+    def window(self, start, end = math.inf):
+        n = len(self)
+        k = bisect_left(range(n), start, key = lambda k: self.times[self._position(k)])
+        pairs = []
+        for k in range(k, n):
+            position = self._position(k)
+            if (self.times[position] >= end):
+                break
+            if (not math.isnan(self.values[position])):
+                pairs.append((self.times[position], self.values[position]))
+        return pairs
+
+
+# Ring buffers of all stations & variables:
+class ObservationStore:
+    def __init__(self, capacity = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.buffers  = {}          # (fmisid, variable): RingBuffer
+        self.names    = {}          # fmisid: station name
+
+    # Append an observation, returns True if it was new
+    def append(self, station, variable, t, value):
+        buffer = self.buffers.get((station, variable))
+        if (buffer is None):
+            buffer = self.buffers[(station, variable)] = RingBuffer(self.capacity)
+        return buffer.append(t, value)
+
+    def stations(self):
+        return sorted({station for station, variable in self.buffers})
+
+    def variables(self, station):
+        return sorted(variable for s, variable in self.buffers if s == station)
+
+    # Latest (time, value) of a station's variable, None if not available
+    def latest(self, station, variable):
+        buffer = self.buffers.get((station, variable))
+        return buffer.latest() if buffer is not None else None
+
+    # (time, value) pairs of the last seconds before end (default: the latest observation time)
+    def window(self, station, variable, seconds, end = None):
+        buffer = self.buffers.get((station, variable))
+        if (buffer is None):
+            return []
+        if (end is None):
+            latest = buffer.latest()
+            if (latest is None):
+                return []
+            end = latest[0] + 1
+        return buffer.window(end - seconds, end)
+
+    # Mean, minimum and maximum of a rolling window, None if there are no values
+    def rolling_stats(self, station, variable, seconds, end = None):
+        values = [value for t, value in self.window(station, variable, seconds, end)]
+        if (len(values) == 0):
+            return None
+        return (math.fsum(values) / len(values), min(values), max(values))
+
+
+# Parse observations of a WFS timevaluepair response
+#   - Input: raw GML data (bytes)
+#   - Yields: (fmisid, station name, variable, epoch seconds, value) - missing values as NaN
+#   - Streaming parser, parsed elements are cleared as we go. Each distinct timestamp is converted once.
+def iter_observations(data):
+    identifier_tag = '{%s}identifier' % namespaces['gml']
+    name_tag       = '{%s}name' % namespaces['gml']
+    location_tag   = '{%s}Location' % namespaces['target']
+    timeseries_tag = '{%s}MeasurementTimeseries' % namespaces['wml2']
+    tvp_tag        = '{%s}MeasurementTVP' % namespaces['wml2']
+    time_tag       = '{%s}time' % namespaces['wml2']
+    value_tag      = '{%s}value' % namespaces['wml2']
+    member_tag     = '{%s}member' % namespaces['wfs']
+
+    epochs   = {}               # Time text: epoch seconds
+    station  = None
+    name     = None
+    variable = None
+    for event, element in ET.iterparse(BytesIO(data), events = ('start', 'end')):
+        if (event == 'start'):
+            if (element.tag == timeseries_tag):
+                variable = str(list(element.attrib.values())[0].split('-')[-1])    # Get variable name
+            elif (element.tag == member_tag):
+                station, name = None, None
+        elif (element.tag == tvp_tag):
+            stamp = element.findtext(time_tag)
+            t = epochs.get(stamp)
+            if (t is None):
+                t = epochs[stamp] = calendar.timegm(time.strptime(stamp, TIME_FORMAT))
+            value = element.findtext(value_tag)
+            yield (station, name, variable, t, math.nan if value == 'NaN' else float(value))
+            element.clear()
+        elif (element.tag == identifier_tag and element.get('codeSpace', '').endswith('/fmisid')):
+            station = element.text.strip()
+        elif (element.tag == name_tag and element.get('codeSpace', '').endswith('/name')):
+            name = element.text.strip()
+        elif (element.tag in (timeseries_tag, location_tag, member_tag)):
+            element.clear()
+
+
+# Polls FMI for a list of stations and appends observations to a store
+#   - Inputs: list of fmisids, base url of the WFS service, stations per query, parameters to query
+#     (None = all), store, urllib3 pool manager (default: new pool), directory to record responses to
+class Collector:
+    def __init__(self, stations, base_url = FMI_URL, batch_size = BATCH_SIZE, parameters = None, store = None,
+                 http = None, record_dir = None):
+        self.stations   = [str(station) for station in stations]
+        self.base_url   = base_url
+        self.batch_size = batch_size
+        self.parameters = parameters
+        self.store      = store if store is not None else ObservationStore()
+        self.http       = http if http is not None else urllib3.PoolManager(
+                              maxsize = 2, timeout = urllib3.Timeout(connect = 5, read = 30),
+                              retries = urllib3.Retry(2, backoff_factor = 1))   # Keep-alive connections are reused
+        self.record_dir = record_dir
+        self.recorded   = 0
+        self.since      = {}        # Batch number: end time of the last successful query
+
+    # Stations split to batches:
+    def batches(self):
+        return [self.stations[i:i + self.batch_size] for i in range(0, len(self.stations), self.batch_size)]
+
+    # Query url of a batch of stations on [start, end] (epoch seconds):
+    def query_url(self, batch, start, end):
+        query = [('service', 'WFS'), ('version', '2.0.0'), ('request', 'getFeature'), ('storedquery_id', STORED_QUERY),
+                 ('starttime', time.strftime(TIME_FORMAT, time.gmtime(start))),
+                 ('endtime', time.strftime(TIME_FORMAT, time.gmtime(end)))]
+        query += [('fmisid', station) for station in batch]
+        if (self.parameters):
+            query.append(('parameters', ','.join(self.parameters)))
+        return self.base_url + '?' + urlencode(query)
+
+    def _record(self, data):
+        os.makedirs(self.record_dir, exist_ok = True)
+        with open(os.path.join(self.record_dir, 'response_%04d.xml' % self.recorded), 'wb') as f:
+            f.write(data)
+        self.recorded += 1
+
+    # Query all batches once
+    #   - Returns: (number of new observations, list of errors)
+    #   - A failing batch doesn't stop the others, its time window is retried on the next poll
+    def poll(self, now = None, history = HISTORY):
+        now = time.time() if now is None else now
+        appended = 0
+        errors = []
+        for number, batch in enumerate(self.batches()):
+            start = self.since[number] - OVERLAP if number in self.since else now - history
+            try:
+                response = self.http.request('GET', self.query_url(batch, start, now))
+                if (response.status != 200):
+                    raise IOError('HTTP status %d' % response.status)
+                if (self.record_dir):
+                    self._record(response.data)
+                for station, name, variable, t, value in iter_observations(response.data):
+                    if (name is not None):
+                        self.store.names[station] = name
+                    appended += self.store.append(station, variable, t, value)
+            except Exception as e:
+                errors.append('Stations %s: %s' % (','.join(batch), e))
+                continue
+            self.since[number] = now
+        return (appended, errors)
+
+    # Poll every interval seconds, polls = number of polls (None = forever)
+    #   - callback(collector, appended, errors) is called after each poll
+    def run(self, interval = POLL_INTERVAL, polls = None, callback = None):
+        done = 0
+        while (polls is None or done < polls):
+            started = time.monotonic()
+            appended, errors = self.poll()
+            done += 1
+            if (callback is not None):
+                callback(self, appended, errors)
+            if (polls is None or done < polls):
+                time.sleep(max(interval - (time.monotonic() - started), 0))
+
+
+# Local stand-in for the WFS service: serves recorded responses in order (query is ignored), starting over
+# at the end
+#   - Returns (server, base url), the server runs in a daemon thread. Port 0 = any free port.
+def start_replay_server(directory, port = 0):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    files = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.xml'))
+    if (len(files) == 0):
+        raise IOError('No recorded responses in ' + directory)
+    served = [0]
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'       # Keep-alive, like the real service
+
+        def do_GET(self):
+            with open(files[served[0] % len(files)], 'rb') as f:
+                data = f.read()
+            served[0] += 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/xml; charset=UTF-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), ReplayHandler)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    return (server, 'http://127.0.0.1:%d/wfs' % server.server_address[1])
+
+
+# Function to print the latest temperature & wind of each station with one hour statistics:
+def print_summary(collector, appended, errors):
+    store = collector.store
+    print('%s  %d new observations' % (time.strftime('%d/%m/%Y %H:%M'), appended))
+    for station in store.stations():
+        row = '%-8s %-28s' % (station, store.names.get(station, ''))
+        for variable, unit in (('t2m', '°C'), ('ws_10min', 'm/s')):
+            latest = store.latest(station, variable)
+            stats  = store.rolling_stats(station, variable, 3600)
+            if (latest is None):
+                row += '  %s: %5s %-3s' % (variable, '--', unit) + ' ' * 24
+            else:
+                row += '  %s: %5.1f %-3s (1 h: %5.1f .. %5.1f)' % (variable, latest[1], unit, stats[1], stats[2])
+        print(row)
+    for error in errors:
+        print(error, file = sys.stderr)
+    print()
+
+
+
+# # # # # # # # # # #
+#       Main:       #
+# # # # # # # # # # #
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Collects FMI weather observations of several stations.')
+    parser.add_argument('stations', nargs = '+', help = 'station fmisids, e.g. 101004 100971')
+    parser.add_argument('--base-url', default = FMI_URL, help = 'WFS service url (default: %(default)s)')
+    parser.add_argument('--batch-size', type = int, default = BATCH_SIZE, help = 'stations per query (default: %(default)s)')
+    parser.add_argument('--parameters', help = 'comma separated variables to query, e.g. t2m,ws_10min (default: all)')
+    parser.add_argument('--interval', type = float, default = POLL_INTERVAL, help = 'seconds between polls (default: %(default)s)')
+    parser.add_argument('--polls', type = int, help = 'number of polls (default: forever)')
+    parser.add_argument('--capacity', type = int, default = DEFAULT_CAPACITY, help = 'observations kept per station & variable (default: %(default)s)')
+    parser.add_argument('--record', metavar = 'DIR', help = 'save raw responses to a directory')
+    parser.add_argument('--replay', metavar = 'DIR', help = 'serve recorded responses locally and poll them instead of FMI')
+    options = parser.parse_args()
+
+    base_url = options.base_url
+    if (options.replay):
+        server, base_url = start_replay_server(options.replay)
+
+    collector = Collector(options.stations, base_url, options.batch_size,
+                          options.parameters.split(',') if options.parameters else None,
+                          ObservationStore(options.capacity), record_dir = options.record)
+    try:
+        collector.run(options.interval, options.polls, print_summary)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,5 @@
+# The modules are top level scripts of the repository root, make them importable in tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from Datum_transformations import wgs84
+from Geodesic import distance_matrix, inverse, polygon_area, ring_area, to_azimuth, track_length
+
+
+# Reference values: pyproj.Geod (Karney) on GRS80
+POLE_RING = ([80.0] * 4, [0.0, 90.0, 180.0, 270.0])
+POLE_RING_AREA = 2507270031280.9062
+SMALL_RING = ([60.0, 60.0, 60.1, 60.1], [24.0, 24.2, 24.2, 24.0])
+SMALL_RING_AREA = 124149222.51507568
+
+# Finland's rough outline (Åland to Utsjoki):
+FINLAND = ([59.8, 60.4, 62.5, 64.5, 65.8, 68.5, 69.0, 70.1, 69.0, 68.0, 66.5, 64.0, 61.5, 60.5],
+           [22.0, 21.0, 21.2, 24.5, 24.2, 20.8, 20.6, 27.9, 28.8, 30.0, 29.1, 30.0, 29.5, 27.5])
+
+
+def test_inverse_reference():
+    d, az1, az2 = inverse(60.17, 24.95, 59.33, 18.07)       # Helsinki - Stockholm
+    assert d == pytest.approx(397754.93214901007, abs = 1e-4)
+    assert az1 == pytest.approx(-100.61250401065183 + 360, abs = 1e-9)
+    assert az2 == pytest.approx(73.44233296189289 + 180, abs = 1e-9)
+
+
+def test_azimuths_on_0_360():
+    assert to_azimuth(np.array([-1e-20, 0.0, -np.pi / 2])).tolist() == [0.0, 0.0, 270.0]
+    rng = np.random.default_rng(2)
+    lat1, lon1, lat2, lon2 = rng.uniform(-89, 89, 1000), rng.uniform(-180, 180, 1000), rng.uniform(-89, 89, 1000), rng.uniform(-180, 180, 1000)
+    d, az1, az2 = inverse(lat1, lon1, lat2, lon2)
+    assert np.all((az1 >= 0) & (az1 < 360)) and np.all((az2 >= 0) & (az2 < 360))
+    assert inverse(10.0, 5.0, 20.0, 5.0)[1] == 0.0
+
+
+def test_ring_area_reference():
+    assert ring_area(*SMALL_RING) == pytest.approx(SMALL_RING_AREA, rel = 1e-8)
+    assert ring_area(SMALL_RING[0][::-1], SMALL_RING[1][::-1]) == pytest.approx(-SMALL_RING_AREA, rel = 1e-8)
+
+
+@pytest.mark.parametrize("lats, lons, sign", [
+    (POLE_RING[0], POLE_RING[1], 1),                                    # North pole, counterclockwise
+    (POLE_RING[0], POLE_RING[1][::-1], -1),                             # North pole, clockwise
+    ([-lat for lat in POLE_RING[0]], POLE_RING[1][::-1], 1),            # South pole, counterclockwise
+    ([-lat for lat in POLE_RING[0]], POLE_RING[1], -1),                 # South pole, clockwise
+])
+def test_ring_area_around_pole(lats, lons, sign):
+    # Great circle edges of ~1500 km on the authalic sphere vs. geodesics: ~1e-4
+    assert ring_area(lats, lons) == pytest.approx(sign * POLE_RING_AREA, rel = 1e-4)
+    assert polygon_area(lats, lons) == pytest.approx(POLE_RING_AREA, rel = 1e-4)
+
+
+def test_polygon_area_with_hole():
+    assert polygon_area(*FINLAND, holes = [SMALL_RING]) == pytest.approx(polygon_area(*FINLAND) - ring_area(*SMALL_RING), rel = 1e-12)
+
+
+def test_distance_matrix_matches_inverse():
+    lats, lons = [60.0, 60.5, 61.0], [24.0, 25.0, 23.5]
+    matrix = distance_matrix(lats, lons, block_size = 2)
+    assert matrix.shape == (3, 3)
+    assert np.allclose(matrix, inverse(np.array(lats)[:, None], np.array(lons)[:, None], lats, lons)[0])
+    assert np.all(np.diag(matrix) == 0)
+
+
+# Comparison with pyproj (Karney) of random pairs around the world, a few nearly antipodal ones, a random
+# walk track and a polygon
+def test_compare_with_pyproj():
+    pyproj = pytest.importorskip("pyproj")
+    geod = pyproj.Geod(a = wgs84["a"], b = wgs84["b"])
+    rng = np.random.default_rng(1)
+
+    n = 20000
+    lat1, lon1 = rng.uniform(-89, 89, n), rng.uniform(-180, 180, n)
+    lat2, lon2 = rng.uniform(-89, 89, n), rng.uniform(-180, 180, n)
+    lat2[:5], lon2[:5] = -lat1[:5] + 0.0005, lon1[:5] + 179.7
+    d, az1, az2 = inverse(lat1, lon1, lat2, lon2, wgs84)
+    ref_az1, ref_back, ref_d = geod.inv(lon1, lat1, lon2, lat2)
+    assert np.max(np.abs(d - ref_d)) < 1e-3
+    assert np.max(np.abs((az1 - ref_az1 + 180) % 360 - 180)) < 1e-6
+    assert np.max(np.abs((az2 - ref_back) % 360 - 180)) < 1e-6
+
+    m = 100000
+    track_lats = 60.15 + np.cumsum(rng.normal(0, 0.00004, m))
+    track_lons = 24.95 + np.cumsum(rng.normal(0, 0.00008, m))
+    assert track_length(track_lats, track_lons, wgs84) == pytest.approx(geod.line_length(track_lons, track_lats), abs = 1e-3)
+
+    ref_area = abs(geod.polygon_area_perimeter(FINLAND[1], FINLAND[0])[0])
+    assert polygon_area(*FINLAND, ellipsoid = wgs84) == pytest.approx(ref_area, rel = 1e-5)     # Edges of ~300 km
+    ref_area = geod.polygon_area_perimeter(POLE_RING[1], POLE_RING[0])[0]
+    assert ring_area(*POLE_RING, ellipsoid = wgs84) == pytest.approx(ref_area, rel = 1e-4)
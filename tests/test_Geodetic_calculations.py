@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from Datum_transformations import grs80
+from Geodetic_calculations import (cartesian_to_geodetic, dd_to_dms, dms_to_dd, geodetic_to_cartesian, normal_gravity,
+                                   utm_central_meridian, utm_scale_error_at_point, utm_scale_error_distance)
+
+
+# Reference values calculated with the formulas of Geodetic_calculations.c (double precision):
+REFERENCES = [
+    ("dms_to_dd",           lambda: dms_to_dd([60, -24, 179, 0], [11, 57, 59, 30], [47.112, 37.159, 59.999, 0]),
+                            [60.196420000000, -24.960321944444, 179.999999722222, 0.5], 1e-11),
+    ("dd_to_dms degrees",   lambda: dd_to_dms([60.196420, 24.960322, 0.99999999999999, 179.5, 12.5])[0], [60, 24, 1, 179, 12], 0),
+    ("dd_to_dms minutes",   lambda: dd_to_dms([60.196420, 24.960322, 0.99999999999999, 179.5, 12.5])[1], [11, 57, 0, 30, 30], 0),
+    ("dd_to_dms seconds",   lambda: dd_to_dms([60.196420, 24.960322, 0.99999999999999, 179.5, 12.5])[2],
+                            [47.112, 37.1592, 0, 0, 0], 1e-8),
+    ("normal_gravity",      lambda: normal_gravity([0, 45, 60.19642, 90]),
+                            [978032.677150, 980619.920263, 981933.238620, 983218.636836], 1e-6),
+    ("geodetic_to_cartesian", lambda: np.ravel(geodetic_to_cartesian(grs80, [60.19642, -33.9, 0], [24.960322, 151.2, 0], [20, 100, 0])),
+                            [2881305.898302, -4644018.761981, 6378137.0, 1341146.579529, 2553070.919270, 0.0,
+                             5511403.945908, -3537301.122280, 0.0], 1e-6),
+    ("cartesian_to_geodetic", lambda: np.ravel(cartesian_to_geodetic(grs80, [2881305.898302, -4644018.761981, 6378137.0],
+                                                                     [1341146.579529, 2553070.919270, 0.0],
+                                                                     [5511403.945908, -3537301.122280, 0.0])[:3]),
+                            [60.1964199997, -33.8999999997, 0.0, 24.9603220000, 151.2, 0.0, 19.999939, 99.999975, 0.0], 1e-6),
+    ("utm_scale_error_distance", lambda: utm_scale_error_distance([500000, 320000, 680000, 166000, 834000]) * 1e6,
+                            [-400.0, -1.804, -1.804, 971.02324, 971.02324], 1e-6),
+]
+
+
+@pytest.mark.parametrize("name, result, expected, tolerance", REFERENCES, ids = [r[0] for r in REFERENCES])
+def test_reference_values(name, result, expected, tolerance):
+    assert np.max(np.abs(np.asarray(result(), dtype = np.float64) - np.asarray(expected, dtype = np.float64))) <= tolerance
+
+
+# UTM scale errors (PPM) of GRS80 points: pyproj Proj(proj="utm", zone, ellps="GRS80").get_factors(lon, lat)
+# meridional scale - 1. Off the central meridian the longitude dependent series terms matter.
+UTM_SCALE_REFERENCES = [
+    (60.0, 27.0, -400.0),                   # On central meridians k = k0
+    (-45.0, 21.0, -400.0),
+    (0.0, 3.0, -400.0),
+    (60.0, 29.0, -247.52324236265721),      # Zone 35, 2° east of the central meridian
+    (60.0, 30.0, -57.00472296621406),       # Zone 35, 3° east
+    (65.0, 24.5, -229.90816382240098),      # Zone 35, 2.5° west
+    (-45.0, 23.0, -94.46364840270948),      # Zone 34 south, 2° east
+    (0.0, 6.0, 981.0615586285376),          # Equator on the zone 31/32 edge, 3° from either central meridian
+]
+
+
+@pytest.mark.parametrize("lat, lon, ppm", UTM_SCALE_REFERENCES)
+def test_utm_scale_error_at_point(lat, lon, ppm):
+    assert utm_scale_error_at_point(lat, lon) * 1e6 == pytest.approx(ppm, abs = 1e-3)
+
+
+def test_utm_scale_error_with_fixed_central_meridian():
+    lats, lons = np.array([60.0, 60.0]), np.array([29.0, 33.0])
+    assert utm_central_meridian(lons).tolist() == [27.0, 33.0]
+    errors = utm_scale_error_at_point(lats, lons, central_meridian = 27.0) * 1e6
+    assert errors[0] == pytest.approx(-247.52324236265721, abs = 1e-3)
+    assert errors[1] > errors[0]
@@ -0,0 +1,88 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from Korona import FeedCache
+
+
+# Feed server on localhost: serves the current feed with ETag & Last-Modified, 304 on a conditional match
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        etag = '"%d"' % server.version
+        last_modified = "Sun, 0%d Mar 2020 10:00:00 GMT" % server.version
+        if (self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == last_modified):
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(server.feed).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = HTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.requests = []
+    server.version = 1
+    server.feed = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def record(date, district):
+    return {"date": date + "T10:00:00.000Z", "healthCareDistrict": district}
+
+
+def stored(cache, section):
+    return sorted((r["date"][:10], r["healthCareDistrict"] or "") for _, r in cache.records(section))
+
+
+def test_first_fetch_not_modified_and_delta(feed_server, tmp_path):
+    url = "http://127.0.0.1:%d/" % feed_server.server_address[1]
+    feed_server.feed = {"confirmed": [record("2020-03-01", "HUS"), record("2020-03-02", "HUS"),
+                                      record("2020-03-02", None)],
+                        "deaths": [record("2020-03-02", "HUS")],
+                        "updated": "2020-03-02"}
+    cache = FeedCache(str(tmp_path), url)
+
+    # First fetch: everything is stored, no conditional headers
+    assert cache.update() == {"confirmed": 3, "deaths": 1}
+    assert "If-None-Match" not in feed_server.requests[-1]
+    assert stored(cache, "confirmed") == [("2020-03-01", "HUS"), ("2020-03-02", ""), ("2020-03-02", "HUS")]
+    assert cache.meta["sections"]["confirmed"]["districts"] == {"HUS": 1, "": 1}
+
+    # Unchanged feed: conditional request answered with 304, store untouched
+    assert cache.update() == {}
+    assert feed_server.requests[-1]["If-None-Match"] == '"1"'
+    assert feed_server.requests[-1]["If-Modified-Since"] == "Sun, 01 Mar 2020 10:00:00 GMT"
+    assert len(stored(cache, "confirmed")) == 3
+
+    # Changed feed: a late arrival on the cached maximum date and a newer record are appended,
+    # records already in store aren't duplicated
+    feed_server.version = 2
+    feed_server.feed["confirmed"] += [record("2020-03-02", "HUS"), record("2020-03-03", "Pirkanmaa")]
+    assert cache.update() == {"confirmed": 2}
+    assert stored(cache, "confirmed") == [("2020-03-01", "HUS"), ("2020-03-02", ""), ("2020-03-02", "HUS"),
+                                          ("2020-03-02", "HUS"), ("2020-03-03", "Pirkanmaa")]
+    assert stored(cache, "deaths") == [("2020-03-02", "HUS")]
+    assert cache.meta["etag"] == '"2"'
+
+    # A new cache instance reads the committed store and revalidates with the stored validators
+    reopened = FeedCache(str(tmp_path), url)
+    assert reopened.update() == {}
+    assert stored(reopened, "confirmed") == stored(cache, "confirmed")
@@ -0,0 +1,66 @@
+import os
+from datetime import date
+
+import pytest
+
+from Korona import ranking
+from Korona_index import ALL, DistrictIndex, to_date
+
+
+RECORDS = [
+    ("confirmed", {"date": "2020-03-01T10:00:00.000Z", "healthCareDistrict": "HUS"}),
+    ("confirmed", {"date": "2020-03-01T12:00:00.000Z", "healthCareDistrict": None}),
+    ("confirmed", {"date": "2020-03-02T10:00:00.000Z", "healthCareDistrict": "HUS"}),
+    ("confirmed", {"date": "2020-03-03T10:00:00.000Z", "healthCareDistrict": "Pirkanmaa"}),
+    ("confirmed", {"date": "", "healthCareDistrict": "HUS"}),                 # FeedCache stores missing dates as ""
+    ("deaths", {"healthCareDistrict": "HUS"}),
+]
+
+
+def test_undated_records_are_counted_not_indexed():
+    index = DistrictIndex.build(iter(RECORDS))
+    assert index.undated == {"confirmed": 1, "deaths": 1}
+    assert index.days == 3
+    assert index.total("confirmed") == 4
+    assert index.total("confirmed", "HUS") == 2
+    assert index.total("deaths") == 0
+
+
+def test_records_without_district_are_an_ordinary_district():
+    index = DistrictIndex.build(iter(RECORDS))
+    assert index.total("confirmed", None) == 1
+    assert index.total("confirmed", ALL) == 4
+    assert index.daily("confirmed", None) == [1, 0, 0]
+    assert index.daily("confirmed") == [2, 1, 1]
+    assert index.top("confirmed") == [("HUS", 2), (None, 1), ("Pirkanmaa", 1)]
+    assert index.rolling_rate("confirmed", None, "2020-03-03", window=3) == 1 / 3
+
+
+def test_save_load_round_trip(tmp_path):
+    path = os.path.join(str(tmp_path), "index.bin")
+    DistrictIndex.build(iter(RECORDS), {"confirmed": 5}).save(path)
+    index = DistrictIndex.load(path)
+    assert index.signature == {"confirmed": 5}
+    assert index.undated == {"confirmed": 1, "deaths": 1}
+    assert index.total("confirmed", None) == 1
+    assert index.total("confirmed", ALL, "2020-03-02") == 2
+
+
+def test_top_ties_at_cutoff_follow_ranking():
+    records = [("confirmed", {"date": "2020-03-01", "healthCareDistrict": name}) for name in ("Vaasa", "Pirkanmaa", "HUS")]
+    records.append(("confirmed", {"date": "2020-03-02", "healthCareDistrict": "Vaasa"}))
+    index = DistrictIndex.build(iter(records))
+    assert index.top("confirmed", 2) == [("Vaasa", 2), ("HUS", 1)]
+    assert index.top("confirmed", 3) == ranking({"Vaasa": 2, "Pirkanmaa": 1, "HUS": 1})
+
+
+@pytest.mark.parametrize("text", ["", "2020-3-01", "20200301", "2020-03-01x", "2020-13-01", "yyyy-mm-dd"])
+def test_to_date_rejects_malformed_dates(text):
+    with pytest.raises(ValueError):
+        to_date(text)
+
+
+def test_to_date():
+    assert to_date("2020-03-20") == date(2020, 3, 20)
+    assert to_date("2020-03-20T10:00:00.000Z") == date(2020, 3, 20)
+    assert to_date(date(2020, 3, 20)) == date(2020, 3, 20)
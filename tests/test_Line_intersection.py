@@ -0,0 +1,16 @@
+import pytest
+
+from Geometry_codec import GeometryError
+from Line_intersection import lines_intersect
+
+
+def test_lines_intersect():
+    assert lines_intersect("LINESTRING (0 0, 2 2)", "LINESTRING (0 2, 2 0)") is True
+    assert lines_intersect("LINESTRING (0 0, 2 2)", "LINESTRING (3 0, 3 2)") is False
+
+
+@pytest.mark.parametrize("wkt_a, wkt_b", [("LINESTRING EMPTY", "LINESTRING (0 0, 1 1)"),
+                                          ("LINESTRING (0 0, 1 1)", "LINESTRING EMPTY")])
+def test_empty_linestring(wkt_a, wkt_b):
+    with pytest.raises(GeometryError):
+        lines_intersect(wkt_a, wkt_b)
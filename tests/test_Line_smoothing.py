@@ -0,0 +1,26 @@
+import pytest
+
+from Geometry_codec import GeometryError, linestring_wkt
+from Line_smoothing import douglas_peucker, visvalingam
+
+
+LINE = linestring_wkt(((0.0, 0.0), (1.0, 0.5), (2, 0), (3, 12), (4, 0), (5, 0), (6, 0.9), (7, -0.3), (8, -0.8), (9, 0)))
+
+
+def test_douglas_peucker():
+    assert douglas_peucker(LINE, 1) == "LINESTRING (0.0 0.0, 2.0 0.0, 3.0 12.0, 4.0 0.0, 9.0 0.0)"
+
+
+def test_visvalingam():
+    assert visvalingam(LINE, 1) == "LINESTRING (0.0 0.0, 2.0 0.0, 3.0 12.0, 4.0 0.0, 6.0 0.9, 8.0 -0.8, 9.0 0.0)"
+    assert visvalingam("LINESTRING (0 0, 1 1)", 1) is None
+
+
+def test_douglas_peucker_empty_linestring():
+    with pytest.raises(GeometryError):
+        douglas_peucker("LINESTRING EMPTY", 1)
+
+
+def test_visvalingam_empty_linestring():
+    with pytest.raises(GeometryError):
+        visvalingam("LINESTRING EMPTY", 1)
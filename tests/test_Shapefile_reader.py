@@ -0,0 +1,33 @@
+import struct
+
+from Shapefile_reader import DbfReader
+
+
+# Function to build a dBASE III table: fields [(name, type, length, decimals)], rows [(deleted, (values as text))]
+def dbf_bytes(fields, rows):
+    record_length = 1 + sum(length for name, field_type, length, decimals in fields)
+    header_length = 32 + 32 * len(fields) + 1
+    data = struct.pack("<B3BI2H20x", 3, 120, 1, 1, len(rows), header_length, record_length)
+    for name, field_type, length, decimals in fields:
+        data += struct.pack("<11sc4x2B14x", name.encode("ascii"), field_type.encode("ascii"), length, decimals)
+    data += b"\x0D"
+    for deleted, values in rows:
+        data += b"*" if deleted else b" "
+        for (name, field_type, length, decimals), value in zip(fields, values):
+            data += value.encode("latin-1").ljust(length)[:length]
+    return data + b"\x1A"
+
+
+FIELDS = [("NAME", "C", 10, 0), ("DEPTH", "N", 6, 1)]
+
+
+def test_deleted_records():
+    dbf = DbfReader(dbf_bytes(FIELDS, [(False, ("Väylä 1", "  10.5")), (True, ("Poistettu", "   3.0")),
+                                       (False, ("Väylä 3", "      "))]))
+    assert len(dbf) == 3
+    assert dbf.field_names == ["NAME", "DEPTH"]
+    assert [dbf.is_deleted(i) for i in range(3)] == [False, True, False]
+    assert dbf.record(0) == {"NAME": "Väylä 1", "DEPTH": 10.5}
+    assert dbf.record(1) is None
+    assert dbf.record(2) == {"NAME": "Väylä 3", "DEPTH": None}
+    assert dbf.value(1, "NAME") == "Poistettu"      # Single fields are still readable
@@ -0,0 +1,31 @@
+import os
+
+from Weather import choose_station
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+PREFERENCE = ["Kumpula", "Kaisaniemi"]
+
+
+def read_fixture():
+    with open(os.path.join(DATA_DIR, "fmi_timevaluepair.xml"), "rb") as f:
+        return f.read()
+
+
+def test_nan_count_decides_between_equal_length_responses():
+    with_nans = read_fixture()
+    assert with_nans.count(b"NaN") > 0
+    without_nans = with_nans.replace(b"<wml2:value>NaN<", b"<wml2:value>0.0<")   # Same length, no missing values
+    assert len(without_nans) == len(with_nans)
+
+    # Preferred station has more NaNs -> the other one is chosen
+    assert choose_station({"Kumpula": with_nans, "Kaisaniemi": without_nans}, PREFERENCE) == "Kaisaniemi"
+    # Preferred station has no more NaNs -> it's kept
+    assert choose_station({"Kumpula": without_nans, "Kaisaniemi": with_nans}, PREFERENCE) == "Kumpula"
+    assert choose_station({"Kumpula": with_nans, "Kaisaniemi": with_nans}, PREFERENCE) == "Kumpula"
+
+
+def test_longer_response_and_missing_stations():
+    data = read_fixture()
+    assert choose_station({"Kumpula": data[:1000], "Kaisaniemi": data}, PREFERENCE) == "Kaisaniemi"
+    assert choose_station({"Kaisaniemi": data[:1000]}, PREFERENCE) == "Kaisaniemi"
@@ -0,0 +1,48 @@
+import calendar
+import os
+
+import pytest
+
+from Weather_collector import Collector, ObservationStore, start_replay_server
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+T0 = calendar.timegm((2020, 3, 20, 10, 0, 0))       # First observation time of the fixture
+
+
+@pytest.fixture
+def replay_url():
+    server, base_url = start_replay_server(DATA_DIR)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_collector_against_replay_server(replay_url, tmp_path):
+    store = ObservationStore(capacity = 4)
+    collector = Collector([100971, 101004], replay_url, batch_size = 2, store = store, record_dir = str(tmp_path))
+
+    appended, errors = collector.poll(now = T0 + 1500)
+    assert errors == []
+    assert appended == 12                           # 2 stations x 2 variables x 3 times, missing values too
+    assert store.stations() == ["100971", "101004"]
+    assert store.variables("100971") == ["t2m", "ws_10min"]
+    assert store.names == {"100971": "Helsinki Kaisaniemi", "101004": "Helsinki Kumpula"}
+
+    # Latest non-missing values, NaN at the latest time is skipped:
+    assert store.latest("100971", "t2m") == (T0 + 600, 3.6)
+    assert store.latest("100971", "ws_10min") == (T0 + 1200, 4.6)
+    assert store.latest("101004", "ws_10min") is None
+    assert store.window("100971", "ws_10min", 1200) == [(T0 + 600, 5.0), (T0 + 1200, 4.6)]
+    assert store.window("101004", "ws_10min", 3600) == []
+    mean, minimum, maximum = store.rolling_stats("101004", "t2m", 3600)
+    assert (round(mean, 6), minimum, maximum) == (3.0, 2.9, 3.1)
+
+    # Response was recorded as is
+    with open(os.path.join(DATA_DIR, "fmi_timevaluepair.xml"), "rb") as f:
+        assert (tmp_path / "response_0000.xml").read_bytes() == f.read()
+
+    # Same response again on the next poll: nothing new
+    assert collector.poll(now = T0 + 2100) == (0, [])
+    assert len(store.buffers[("100971", "t2m")]) == 3
+